@@ -0,0 +1,82 @@
+"""Load generator for the local transcription API.
+
+Fires ``--requests`` POSTs at ``/transcribe`` from ``--concurrency`` client
+threads and reports throughput, latency percentiles and how well the server
+batched them:
+
+    uv run python api_loadgen.py --concurrency 8 --requests 64 [--clip note.wav]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import load_config
+
+SAMPLERATE = 16000
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "audio/pcm"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        json.load(response)
+    return time.perf_counter() - start
+
+
+def health(base):
+    with urllib.request.urlopen(base + "/health") as response:
+        return json.load(response)
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Measure the local transcription API under load")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{config['api_port']}")
+    parser.add_argument("--clip", help="audio file to send (default: built-in synthetic clip)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of the synthetic clip")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.clip:
+        from audio_files import load_audio
+        audio = load_audio(args.clip, SAMPLERATE)
+        query = ""
+    else:
+        from autotune import calibration_clip
+        audio = calibration_clip(args.seconds)
+        # Silero finds no speech in the synthetic clip, so skip VAD for it
+        query = "?vad_filter=0"
+    body = (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+    url = args.url + "/transcribe" + query
+
+    post(url, body)  # warm-up
+    before = health(args.url)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(lambda _: post(url, body), range(args.requests)))
+    wall_s = time.perf_counter() - start
+    after = health(args.url)
+
+    if len(latencies) < 2:
+        sys.exit("need at least 2 requests for percentiles")
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    batches = after["batches"] - before["batches"]
+    requests = after["requests"] - before["requests"]
+    print(f"{after['model']} ({after['device']}), {len(audio) / SAMPLERATE:.1f}s clip, "
+          f"{args.requests} requests from {args.concurrency} clients")
+    print(f"  {args.requests / wall_s:.2f} req/s, "
+          f"{args.requests * len(audio) / SAMPLERATE / wall_s:.1f} audio-s/s")
+    print(f"  p50 {percentiles[49] * 1000:.0f} ms, p99 {percentiles[98] * 1000:.0f} ms")
+    if batches:
+        print(f"  {requests / batches:.1f} requests per batched decode")
+
+
+if __name__ == "__main__":
+    main()
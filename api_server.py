@@ -0,0 +1,400 @@
+"""Opt-in HTTP/WebSocket transcription API on the loopback interface.
+
+Lets other local tools (editor plugins, meeting recorders) use the model
+WhisperDrop already holds. Set ``"api_server": true`` to start it inside the
+widget, or run it headless with its own model:
+
+    uv run python api_server.py [--model small] [--port 8765]
+
+Endpoints, all on 127.0.0.1 only:
+
+- ``POST /transcribe`` -- body is a WAV/FLAC/OGG file, or raw 16-bit
+  little-endian mono PCM with ``Content-Type: audio/pcm`` (``?rate=`` if not
+  16 kHz). Returns ``{"text", "segments", "duration", "elapsed"}``.
+- ``GET /stream`` (WebSocket) -- send 16 kHz 16-bit PCM as binary frames,
+  receive ``{"text", "final": false}`` as words are committed; send the text
+  frame ``end`` to get ``{"text", "final": true}``.
+- ``GET /health`` -- model, device and batching counters.
+
+Query parameters ``language``, ``beam_size``, ``initial_prompt``,
+``word_timestamps`` and ``vad_filter`` override the config defaults.
+
+Concurrent requests with the same decode options are transcribed together:
+their audio is concatenated and decoded in one batched call, with
+``clip_timestamps`` marking each request's speech chunks.
+"""
+import argparse
+import base64
+import bisect
+import hashlib
+import io
+import json
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from audio_buffer import AudioBuffer
+from config import load_config
+from model_server import Info, Segment, Word, segment_to_dict
+from streaming import StreamingTranscriber
+
+SAMPLERATE = 16000
+HOST = "127.0.0.1"
+LOOPBACK_NAMES = {"127.0.0.1", "localhost", "::1"}
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def speech_spans(audio, vad_filter=True, chunk_s=30):
+    """Split ``audio`` into (start, end) sample spans of at most ``chunk_s``."""
+    if vad_filter:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+        vad_options = VadOptions(max_speech_duration_s=chunk_s, min_silence_duration_ms=160)
+        chunks = merge_segments(get_speech_timestamps(audio, vad_options), vad_options)
+        return [(c["start"], c["end"]) for c in chunks]
+    chunk = chunk_s * SAMPLERATE
+    return [(start, min(start + chunk, len(audio))) for start in range(0, len(audio), chunk)]
+
+
+class Job:
+    def __init__(self, audio, spans, options):
+        self.audio = audio
+        self.spans = spans
+        self.options = options
+        self.key = json.dumps(options, sort_keys=True)
+        self.future = Future()
+
+
+class BatchScheduler:
+    """Collects concurrent requests and decodes them in shared batched calls.
+
+    The first request waits at most ``max_wait_ms`` for company; requests
+    that arrive while a batch is decoding simply join the next one. Only
+    requests with identical decode options share a batch.
+    """
+
+    def __init__(self, model, batch_size=8, max_wait_ms=20):
+        from faster_whisper import BatchedInferencePipeline
+        self.pipeline = BatchedInferencePipeline(model)
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.backlog = []
+        self.stats = {"requests": 0, "batches": 0, "chunks": 0}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, audio, vad_filter=True, **options):
+        """Queue ``audio`` for decoding; the future resolves to its segments."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        job = Job(audio, speech_spans(audio, vad_filter), options)
+        if job.spans:
+            self.queue.put(job)
+        else:
+            job.future.set_result([])
+        return job.future
+
+    def _next_batch(self):
+        pending = self.backlog or [self.queue.get()]
+        key = pending[0].key
+        deadline = time.perf_counter() + self.max_wait
+        while sum(len(job.spans) for job in pending if job.key == key) < self.batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                pending.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        batch = [job for job in pending if job.key == key]
+        self.backlog = [job for job in pending if job.key != key]
+        return batch
+
+    def _decode(self, batch):
+        clips, starts, offset = [], [], 0
+        for job in batch:
+            starts.append(offset / SAMPLERATE)
+            clips.extend({"start": offset + start, "end": offset + end} for start, end in job.spans)
+            offset += len(job.audio)
+        audio = np.concatenate([job.audio for job in batch])
+        segments, _ = self.pipeline.transcribe(
+            audio, clip_timestamps=clips, vad_filter=False,
+            batch_size=self.batch_size, **batch[0].options
+        )
+
+        # Hand each segment back to the request whose audio contains it
+        results = [[] for _ in batch]
+        for s in segments:
+            index = bisect.bisect_right(starts, (s.start + s.end) / 2) - 1
+            base = starts[index]
+            words = None
+            if s.words is not None:
+                words = [Word(w.start - base, w.end - base, w.word, w.probability) for w in s.words]
+            results[index].append(Segment(s.start - base, s.end - base, s.text, words))
+
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["chunks"] += len(clips)
+        return results
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self._decode(batch)
+            except Exception as e:
+                print(f"API transcription error: {e}")
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+            for job, segments in zip(batch, results):
+                job.future.set_result(segments)
+
+
+class BatchedModel:
+    """``WhisperModel.transcribe`` look-alike that goes through the scheduler."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def transcribe(self, audio, condition_on_previous_text=None, **options):
+        segments = self.scheduler.submit(audio, **options).result()
+        return segments, Info(options.get("language"), len(audio) / SAMPLERATE)
+
+
+class WebSocket:
+    """Just enough of RFC 6455 for a server: unfragmented sends, masked reads."""
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def _read(self, n):
+        data = self.rfile.read(n)
+        if len(data) < n:
+            raise ConnectionError("Connection closed")
+        return data
+
+    def recv(self):
+        """Return (opcode, payload) of the next data or close message."""
+        message, message_opcode = bytearray(), None
+        while True:
+            first, second = self._read(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", self._read(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", self._read(8))
+            mask = self._read(4) if second & 0x80 else None
+            payload = self._read(length)
+            if mask is not None and length:
+                payload = (np.frombuffer(payload, np.uint8)
+                           ^ np.resize(np.frombuffer(mask, np.uint8), length)).tobytes()
+
+            if opcode == 0x9:
+                self.send(payload, opcode=0xA)
+            elif opcode == 0x8:
+                return opcode, payload
+            elif opcode in (0x0, 0x1, 0x2):
+                if opcode:
+                    message_opcode = opcode
+                message += payload
+                if first & 0x80:
+                    return message_opcode, bytes(message)
+
+    def send(self, payload, opcode=0x1):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        self.wfile.write(header + payload)
+        self.wfile.flush()
+
+
+def decode_upload(body, content_type, rate):
+    """Turn a request body into 16 kHz mono float32."""
+    if content_type in ("audio/pcm", "audio/l16"):
+        audio = np.frombuffer(body, dtype="<i2").astype(np.float32) / 32768
+        if rate != SAMPLERATE:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=rate, target_sr=SAMPLERATE)
+        return audio
+    from audio_files import load_audio
+    return load_audio(io.BytesIO(body), SAMPLERATE)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _is_local(self):
+        # Refuse browser pages that reach loopback through DNS rebinding
+        for header in ("Host", "Origin"):
+            value = self.headers.get(header)
+            if value is not None and urlsplit(value if "//" in value else "//" + value).hostname not in LOOPBACK_NAMES:
+                return False
+        return True
+
+    def _options(self, query):
+        config = self.server.config
+        options = {"language": config["language"], "beam_size": config["beam_size"]}
+        for name, values in parse_qs(query).items():
+            value = values[-1]
+            if name == "beam_size":
+                options[name] = int(value)
+            elif name in ("word_timestamps", "vad_filter"):
+                options[name] = value.lower() in ("1", "true", "yes")
+            elif name in ("language", "initial_prompt"):
+                options[name] = value or None
+        return options
+
+    def do_GET(self):
+        if not self._is_local():
+            return self._send_json(403, {"error": "loopback clients only"})
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            server = self.server
+            return self._send_json(200, dict(server.scheduler.stats,
+                                             model=server.model_name, device=server.device_used))
+        if url.path == "/stream" and self.headers.get("Upgrade", "").lower() == "websocket":
+            return self.handle_stream(self._options(url.query))
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._is_local():
+            return self._send_json(403, {"error": "loopback clients only"})
+        url = urlsplit(self.path)
+        if url.path != "/transcribe":
+            return self._send_json(404, {"error": "not found"})
+        length = self.headers.get("Content-Length")
+        if length is None:
+            return self._send_json(411, {"error": "Content-Length required"})
+
+        start = time.perf_counter()
+        body = self.rfile.read(int(length))
+        try:
+            options = self._options(url.query)
+            rate = int(parse_qs(url.query).get("rate", [SAMPLERATE])[-1])
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            audio = decode_upload(body, content_type, rate)
+            segments = self.server.scheduler.submit(audio, **options).result()
+        except Exception as e:
+            return self._send_json(400, {"error": str(e)})
+
+        self._send_json(200, {
+            "text": " ".join(s.text.strip() for s in segments if s.text.strip()),
+            "segments": [segment_to_dict(s) for s in segments],
+            "duration": len(audio) / SAMPLERATE,
+            "elapsed": time.perf_counter() - start,
+        })
+
+    def handle_stream(self, options):
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+
+        config = self.server.config
+        ws = WebSocket(self.rfile, self.wfile)
+        buffer = AudioBuffer(SAMPLERATE)
+        streamer = StreamingTranscriber(
+            self.server.batched_model, SAMPLERATE, config["streaming_window"], **options
+        )
+        interval = int(config["streaming_interval"] * SAMPLERATE)
+        last = ""
+        try:
+            while True:
+                opcode, payload = ws.recv()
+                if opcode == 0x2:
+                    buffer.append(np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768)
+                    if len(buffer) - streamer.processed >= interval:
+                        text = streamer.process(buffer.view())
+                        if text != last:
+                            ws.send(json.dumps({"text": text, "final": False}))
+                            last = text
+                elif opcode == 0x1 and payload.strip() == b"end":
+                    text = streamer.finish(buffer.view()) if len(buffer) else ""
+                    ws.send(json.dumps({"text": text, "final": True}))
+                    ws.send(b"", opcode=0x8)
+                    return
+                elif opcode == 0x8:
+                    ws.send(b"", opcode=0x8)
+                    return
+        except (ConnectionError, OSError):
+            pass
+        except Exception as e:
+            print(f"API stream error: {e}")
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, model, model_name, device_used, config):
+        self.scheduler = BatchScheduler(model, config["api_batch_size"], config["api_max_wait_ms"])
+        self.batched_model = BatchedModel(self.scheduler)
+        self.model_name = model_name
+        self.device_used = device_used
+        self.config = config
+        super().__init__((HOST, port), ApiHandler)
+
+
+def serve_in_background(model, model_name, device_used, config):
+    """Start the API on a daemon thread next to an already loaded model."""
+    server = ApiServer(config["api_port"], model, model_name, device_used, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 Transcription API on http://{HOST}:{config['api_port']}")
+    return server
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Serve a Whisper model over HTTP/WebSocket on loopback")
+    parser.add_argument("--model", default=config["model_name"])
+    parser.add_argument("--port", type=int, default=config["api_port"])
+    parser.add_argument("--batch-size", type=int, default=config["api_batch_size"])
+    parser.add_argument("--max-wait-ms", type=float, default=config["api_max_wait_ms"])
+    parser.add_argument("--cpu", action="store_true")
+    args = parser.parse_args()
+    config.update(api_port=args.port, api_batch_size=args.batch_size, api_max_wait_ms=args.max_wait_ms)
+
+    from models import load_whisper_model
+
+    print(f"Loading model: {args.model}")
+    model, device_used = load_whisper_model(args.model, force_device="cpu" if args.cpu else None)
+
+    server = ApiServer(args.port, model, args.model, device_used, config)
+    print(f"✅ Serving {args.model} ({device_used}) on http://{HOST}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
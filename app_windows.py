@@ -1,3 +1,6 @@
+import time
+START_TIME = time.perf_counter()
+
 import sys
 import argparse
 
@@ -6,12 +9,9 @@ if sys.platform != "win32":
     sys.exit(1)
 
 import customtkinter as ctk
-import sounddevice as sd
-from faster_whisper import WhisperModel
+import tkinter as tk
 import threading
-import numpy as np
-import torch
-import time
+import queue
 import pyautogui
 import pyperclip
 from pynput import keyboard
@@ -19,10 +19,33 @@ from pynput.keyboard import Key
 from collections import deque
 import random
 
+from audio_buffer import AudioBuffer, SpillBuffer
+from capture import AudioCapture
+from config import load_config
+from inference_process import InferenceProcess
+from history import History
+from inserter import TextInserter
+from metrics import METRICS, dump_periodically, serve_metrics
+from model_cache import ModelCache
+from parallel_decode import PARALLEL, ParallelDecoder
+from pipeline import transcribe_recording
+from streaming import StreamingTranscriber
+from ui_probe import UiProbe
+from vad_gate import SpeechGate
+from warmup import warm_up
+
 pyautogui.FAILSAFE = False
 pyautogui.PAUSE = 0
 
 
+# Modifier presses never change text, so they are neither counted as
+# injected nor as the user typing
+MODIFIER_KEYS = {
+    Key.shift, Key.shift_l, Key.shift_r, Key.ctrl, Key.ctrl_l, Key.ctrl_r,
+    Key.alt, Key.alt_l, Key.alt_r, Key.alt_gr, Key.cmd, Key.cmd_l, Key.cmd_r,
+}
+
+
 class SimpleApp(ctk.CTk):
     def __init__(self, force_device=None):
         super().__init__()
@@ -35,6 +58,7 @@ class SimpleApp(ctk.CTk):
 
         self.bind('<Button-1>', self.click_window)
         self.bind('<B1-Motion>', self.drag_window)
+        self.bind('<Button-3>', self.show_model_menu)
 
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -110,72 +134,122 @@ class SimpleApp(ctk.CTk):
         self.bar_spacing = 3
         self.waveform_bars = []
         self.audio_levels = deque(maxlen=self.num_bars)
+        self.meter_interval_ms = 50
+        self.meter_after = None
         
         self.init_waveform()
         
+        self.config = load_config()
+        
+        self.ui_probe = UiProbe(self)
+        if self.config["ui_probe"]:
+            self.ui_probe.start()
+        
         self.is_recording = False
-        self.audio_frames = []
         self.samplerate = 16000
         self.channels = 1
+        self.audio_buffer = AudioBuffer(self.samplerate)
+        self.capture = AudioCapture(self.samplerate, self.channels, preroll_ms=self.config["preroll_ms"],
+                                    native_rate=self.config["capture_native_rate"])
         
-        self.audio_level = 0
         self.last_levels = deque(maxlen=5)
         
-        self.model_name = "small"
+        self.model_name = self.config["model_name"]
+        self.transcribe_options = dict(
+            beam_size=self.config["beam_size"],
+            language=self.config["language"],
+            vad_filter=not self.config["vad_gate"],
+            vad_parameters=dict(min_silence_duration_ms=300),
+        )
+        self.streaming = self.config["streaming"]
+        self.streamer = None
         self.auto_insert = True
         self.immediate_insert = True
+        self.inserter = TextInserter(self.insert_text, self.delete_text)
+        self.last_key_time = 0.0
+        self.last_activity = 0.0
+        self.first_dictation = True
+        
+        self.jobs = queue.Queue(maxsize=self.config["max_pending_jobs"])
+        self.pending_jobs = 0
+        threading.Thread(target=self.transcription_worker, daemon=True).start()
         
         self.hotkey = Key.f8
+        self.swap_hotkey = Key.f9
+        self.retranscribe_hotkey = Key.f10
         self.setup_global_hotkey()
         
+        self.log_startup("Hotkey armed")
+        
+        # The window and hotkey are live before any heavy import; F8 presses
+        # during loading record normally and are transcribed once it is done
         self.model = None
+        self.draft_model = None
+        self.models = ModelCache(
+            self.load_whisper, self.config["model_ram_budget_mb"],
+            self.config["model_idle_unload_min"] * 60
+        )
+        self.after(60_000, self.unload_idle_models)
+        self.model_ready = threading.Event()
+        self.after(0, self.log_startup, "Window shown")
+        self.start_metrics()
+        self.start_history()
         threading.Thread(target=self.load_model, daemon=True).start()
         
     def init_waveform(self):
-        self.waveform_bars = []
-        self.audio_levels.clear()
-        
+        # Geometry is fixed, so bar x positions and the vertical extent of
+        # every possible bar height are computed once
         total_width = self.num_bars * self.bar_width + (self.num_bars - 1) * self.bar_spacing
         start_x = (self.canvas_width - total_width) // 2
+        self.bar_x = [start_x + i * (self.bar_width + self.bar_spacing) for i in range(self.num_bars)]
+        self.bar_extent = [
+            ((self.canvas_height - h) // 2, (self.canvas_height - h) // 2 + h)
+            for h in range(self.canvas_height + 1)
+        ]
+        self.max_bar_height = self.canvas_height - 10
+        # A fixed per-bar jitter keeps the organic look without redrawing
+        # every bar on every frame
+        self.bar_jitter = [0.7 + random.random() * 0.6 for _ in range(self.num_bars)]
         
-        for i in range(self.num_bars):
-            x = start_x + i * (self.bar_width + self.bar_spacing)
-            
-            bar = self.canvas.create_rectangle(
-                x, self.canvas_height // 2 - 1,
-                x + self.bar_width, self.canvas_height // 2 + 1,
-                fill="#1e1e3a",
-                outline=""
-            )
+        self.waveform_bars = []
+        for x in self.bar_x:
+            y1, y2 = self.bar_extent[2]
+            bar = self.canvas.create_rectangle(x, y1, x + self.bar_width, y2, fill="#1e1e3a", outline="")
             self.waveform_bars.append(bar)
-            self.audio_levels.append(0)
+        self.reset_waveform()
     
-    def update_waveform(self, audio_level):
+    def draw_waveform(self):
+        # Frame clock: one UI-thread timer while recording, no polling thread
+        self.meter_after = None
         if not self.is_recording:
             return
-            
-        normalized_level = min(audio_level / 3000, 1.0)
+        self.meter_after = self.after(self.meter_interval_ms, self.draw_waveform)
         
-        self.last_levels.append(normalized_level)
-        smooth_level = sum(self.last_levels) / len(self.last_levels)
+        if self.capture.start_latency is not None and not self.latency_reported:
+            print(f"⏱ Record start: {self.capture.start_latency * 1000:.1f} ms")
+            if self.capture.resampler is not None:
+                print(f"🎚️ Device at {self.capture.device_rate} Hz, resampled to {self.samplerate} Hz")
+            METRICS.observe("stream_open", self.capture.open_latency)
+            METRICS.observe("first_audio", self.capture.start_latency)
+            self.latency_reported = True
+        overflows = self.capture.overflows - self.capture.overflows_at_start
+        if overflows != self.shown_overflows:
+            self.shown_overflows = overflows
+            self.status_label.configure(text=f"Recording • {overflows} overflow(s)", text_color="#cc4455")
+        if self.capture.blocks == self.meter_blocks:
+            return
+        self.meter_blocks = self.capture.blocks
         
-        self.audio_levels.append(smooth_level)
+        cpu_start = time.thread_time()
+        self.last_levels.append(min(self.capture.rms * 32768 / 3750, 1.0))
+        self.audio_levels.append(sum(self.last_levels) / len(self.last_levels))
+        clipping = self.capture.peak > 0.95
         
-        for i, (bar, level) in enumerate(zip(self.waveform_bars, self.audio_levels)):
-            random_factor = 0.7 + random.random() * 0.6
-            display_level = level * random_factor
-            
-            bar_height = max(3, int(display_level * (self.canvas_height - 10)))
-            
-            start_x = (self.canvas_width - (self.num_bars * (self.bar_width + self.bar_spacing) - self.bar_spacing)) // 2
-            x = start_x + i * (self.bar_width + self.bar_spacing)
-            
-            y1 = (self.canvas_height - bar_height) // 2
-            y2 = y1 + bar_height
-            
-            self.canvas.coords(bar, x, y1, x + self.bar_width, y2)
+        for i, level in enumerate(self.audio_levels):
+            display_level = level * self.bar_jitter[i]
+            height = max(3, int(display_level * self.max_bar_height)) & ~1
             
-            if display_level > 0.7:
+            if display_level > 0.7 or (clipping and i == self.num_bars - 1):
                 color = "#cc4455"
             elif display_level > 0.4:
                 color = "#5b7fff"
@@ -183,21 +257,27 @@ class SimpleApp(ctk.CTk):
                 color = "#3a3a7a"
             else:
                 color = "#1e1e3a"
-                
-            self.canvas.itemconfig(bar, fill=color)
+            
+            if self.bar_state[i] == (height, color):
+                continue
+            bar = self.waveform_bars[i]
+            if self.bar_state[i][0] != height:
+                y1, y2 = self.bar_extent[height]
+                self.canvas.coords(bar, self.bar_x[i], y1, self.bar_x[i] + self.bar_width, y2)
+            if self.bar_state[i][1] != color:
+                self.canvas.itemconfig(bar, fill=color)
+            self.bar_state[i] = (height, color)
+        
+        self.meter_frames += 1
+        self.meter_cpu += time.thread_time() - cpu_start
     
     def reset_waveform(self):
         self.audio_levels.clear()
-        for i in range(self.num_bars):
-            self.audio_levels.append(0)
-            
-        for bar in self.waveform_bars:
-            start_x = (self.canvas_width - (self.num_bars * (self.bar_width + self.bar_spacing) - self.bar_spacing)) // 2
-            i = self.waveform_bars.index(bar)
-            x = start_x + i * (self.bar_width + self.bar_spacing)
-            
-            self.canvas.coords(bar, x, self.canvas_height // 2 - 1,
-                             x + self.bar_width, self.canvas_height // 2 + 1)
+        self.audio_levels.extend([0] * self.num_bars)
+        self.bar_state = [(2, "#1e1e3a")] * self.num_bars
+        y1, y2 = self.bar_extent[2]
+        for x, bar in zip(self.bar_x, self.waveform_bars):
+            self.canvas.coords(bar, x, y1, x + self.bar_width, y2)
             self.canvas.itemconfig(bar, fill="#1e1e3a")
     
     def click_window(self, event):
@@ -221,54 +301,351 @@ class SimpleApp(ctk.CTk):
         try:
             if key == self.hotkey:
                 print("🎯 F8 hotkey detected!")
-                self.after(0, self.toggle_recording)
+                self.after(0, self.on_hotkey, time.perf_counter())
+            elif key == self.swap_hotkey:
+                self.after(0, self.cycle_model)
+            elif key == self.retranscribe_hotkey:
+                self.after(0, self.retranscribe_last)
+            elif key not in MODIFIER_KEYS and not self.inserter.injected_key():
+                # Keys we injected ourselves arrive late; only real typing
+                # should stop a draft from being refined in place
+                self.last_key_time = time.perf_counter()
         except:
             pass
     
     def load_model(self):
+        # Heavy imports (PortAudio, faster-whisper/CTranslate2) happen here,
+        # off the UI thread and after the window is already up
+        try:
+            import sounddevice  # noqa: F401
+            if self.config["warm_mic"]:
+                self.capture.open()
+                print("🎙️ Warm mic stream open")
+        except Exception as e:
+            print(f"Audio input unavailable: {e}")
+        
         try:
             print(f"Loading model: {self.model_name} (device: {self.force_device or 'auto'})")
-            self.after(0, lambda: self.status_label.configure(text="Loading model..."))
+            self.after(0, self.set_status, "Loading model...", "#606060")
             
-            if self.force_device == "cpu":
-                device = "cpu"
-                compute_type = "int8"
-                self.model = WhisperModel(self.model_name, device=device, compute_type=compute_type)
-                self.device_used = "CPU"
-                print(f"Using CPU with {self.model_name}")
-            else:
-                try:
-                    device = "cuda"
-                    compute_type = "float16"
-                    self.model = WhisperModel(self.model_name, device=device, compute_type=compute_type)
-                    self.device_used = "CUDA"
-                    print(f"Using CUDA with {self.model_name}")
-                except Exception:
-                    device = "cpu"
-                    compute_type = "int8"
-                    self.model = WhisperModel(self.model_name, device=device, compute_type=compute_type)
-                    self.device_used = "CPU"
-                    print(f"CUDA failed, using CPU with {self.model_name}")
+            self.model, self.device_used, _ = self.models.get(self.model_name)
+            print(f"Using {self.device_used} with {self.model_name}")
+            
+            if self.config["draft_model"]:
+                print(f"Loading draft model: {self.config['draft_model']}")
+                self.draft_model, _ = self.load_whisper(self.config["draft_model"])
             
-            self.after(0, lambda: self.status_label.configure(text=f"Ready • {self.device_used}", text_color="#606060"))
+            METRICS.labels.update(model=self.model_name, device=self.device_used)
+            self.log_startup("Model loaded")
+            self.warm_model("Warming up...")
+            self.log_startup("Model ready")
+            self.after(0, self.show_ready)
+            if self.config["keep_warm_min"]:
+                self.after(int(self.config["keep_warm_min"] * 60_000), self.keep_warm)
+            
+            if self.config["api_server"]:
+                self.start_api_server()
             
         except Exception as e:
             print(f"Error loading model: {e}")
-            self.after(0, lambda: self.status_label.configure(text="Error", text_color="#cc4455"))
+            self.after(0, self.set_status, "Error", "#cc4455")
+        finally:
+            self.model_ready.set()
     
-    def toggle_recording(self):
-        if self.model is None:
-            print("Model not loaded yet!")
+    def load_whisper(self, name):
+        # "<model>{PARALLEL}" is the multi-replica model for long recordings;
+        # it lives in the same cache, so it counts against the RAM budget
+        if name.endswith(PARALLEL):
+            decoder = ParallelDecoder(name[:-len(PARALLEL)], self.config["parallel_workers"], self.force_device)
+            print(f"Parallel decoding with {decoder.workers} x {decoder.cpu_threads} threads")
+            return decoder, decoder.device
+        if self.config["inference_process"]:
+            process = InferenceProcess(name, self.force_device)
+            return process, process.device
+        from models import load_whisper_model
+        return load_whisper_model(name, self.force_device)
+    
+    def warm_model(self, status):
+        # Pay for lazy allocation, VAD loading and page faults before the
+        # first dictation does
+        self.first_dictation = True
+        if not self.config["warm_up"]:
+            return 0.0
+        self.after(0, self.set_status, status, "#606060")
+        total = 0.0
+        for name, model in self.warm_targets():
+            try:
+                seconds = warm_up(model, self.transcribe_options, self.samplerate)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+                continue
+            METRICS.observe("warm_up", seconds)
+            print(f"🔥 Warmed up {name} in {seconds:.2f}s")
+            total += seconds
+        return total
+    
+    def warm_targets(self):
+        # The draft model types first, so a cold draft is the first delay
+        # the user sees; it idles alongside the main model and is kept warm too
+        targets = [(self.model_name, self.model)]
+        if self.draft_model is not None:
+            targets.append((self.config["draft_model"], self.draft_model))
+        return targets
+    
+    def keep_warm(self):
+        # A tiny decode every keep_warm_min while idle keeps the weights
+        # from being paged out; parked models are left alone
+        idle = time.perf_counter() - max(self.last_activity, self.last_key_time)
+        if (self.model_ready.is_set() and not self.is_recording and not self.pending_jobs
+                and not self.models.parked(self.model_name) and idle > 60):
+            threading.Thread(target=self.run_keep_warm, daemon=True).start()
+        self.after(int(self.config["keep_warm_min"] * 60_000), self.keep_warm)
+    
+    def run_keep_warm(self):
+        for name, model in self.warm_targets():
+            try:
+                seconds = warm_up(model, self.transcribe_options, self.samplerate)
+                print(f"🔥 Kept {name} warm ({seconds:.2f}s)")
+            except Exception as e:
+                print(f"Keep-warm of {name} failed: {e}")
+    
+    def ensure_model(self):
+        # An idle-unloaded model is brought back before it is needed, and
+        # warmed like a fresh load so the cold start is paid (and counted
+        # as a first dictation) here rather than hidden in steady state
+        if self.model_name in self.models:
+            parked = self.models.parked(self.model_name)
+            self.model, _, _ = self.models.get(self.model_name)
+            if parked:
+                self.warm_model(f"Warming {self.model_name}...")
+    
+    def unload_idle_models(self):
+        if self.model_ready.is_set() and not self.is_recording and not self.pending_jobs:
+            threading.Thread(target=self.models.unload_idle, daemon=True).start()
+        self.after(60_000, self.unload_idle_models)
+    
+    def show_model_menu(self, event):
+        resident = dict(self.models.resident())
+        menu = tk.Menu(self, tearoff=0, bg="#1a1a1a", fg="#c0c0c0", bd=0,
+                       activebackground="#2a2a4e", activeforeground="#ffffff")
+        for name in self.config["swap_models"]:
+            label = f"{name} ({resident[name]:.0f} MB)" if name in resident else name
+            marker = "● " if name == self.model_name else "   "
+            menu.add_command(label=marker + label, command=lambda n=name: self.swap_model(n))
+        if self.history is not None:
+            menu.add_separator()
+            menu.add_command(label="   Search history...", command=self.show_history_search)
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+    
+    def cycle_model(self):
+        names = self.config["swap_models"]
+        if not names:
             return
-            
+        index = names.index(self.model_name) + 1 if self.model_name in names else 0
+        self.swap_model(names[index % len(names)])
+    
+    def swap_model(self, name):
+        if name == self.model_name:
+            return
+        if self.is_recording or self.pending_jobs or not self.model_ready.is_set():
+            self.status_label.configure(text="Busy • swap later", text_color="#8a7a40")
+            return
+        # Recordings made during the swap wait for the new model
+        self.model_ready.clear()
+        self.set_status(f"Loading {name}...", "#606060")
+        threading.Thread(target=self.load_swapped_model, args=(name,), daemon=True).start()
+    
+    def load_swapped_model(self, name):
+        try:
+            self.model, self.device_used, seconds = self.models.get(name)
+            self.model_name = name
+            METRICS.labels.update(model=name, device=self.device_used)
+            seconds += self.warm_model(f"Warming {name}...")
+            resident = self.models.resident()
+            print(f"🔁 Swapped to {name} in {seconds:.2f}s, resident: "
+                  + ", ".join(f"{n} {mb:.0f} MB" for n, mb in resident))
+            memory = dict(resident).get(name, 0)
+            self.after(0, self.set_status, f"{name} • {memory:.0f} MB • {seconds:.2f}s", "#606060")
+        except Exception as e:
+            print(f"Error loading model {name}: {e}")
+            self.after(0, self.set_status, "Error", "#cc4455")
+        finally:
+            self.model_ready.set()
+    
+    def start_api_server(self):
+        if isinstance(self.model, InferenceProcess):
+            print("Transcription API needs the model in this process, not starting it")
+            return
+        try:
+            from api_server import serve_in_background
+            self.models.pin(self.model_name)
+            self.api_server = serve_in_background(self.model, self.model_name, self.device_used, self.config)
+        except OSError as e:
+            print(f"Transcription API unavailable: {e}")
+    
+    def log_startup(self, stage):
+        print(f"⏱ {stage}: {(time.perf_counter() - START_TIME) * 1000:.0f} ms after launch")
+    
+    def start_metrics(self):
+        try:
+            if self.config["metrics_port"]:
+                serve_metrics(self.config["metrics_port"])
+        except OSError as e:
+            print(f"Metrics endpoint unavailable: {e}")
+        if self.config["metrics_jsonl"]:
+            dump_periodically(self.config["metrics_jsonl"], self.config["metrics_dump_s"])
+        METRICS.attach("callback_jitter", self.capture.jitter)
+        METRICS.watch("input_overflows", lambda: self.capture.overflows)
+        METRICS.watch("input_underflows", lambda: self.capture.underflows)
+    
+    def start_history(self):
+        self.history = None
+        self.last_dictation = None
+        self.retranscribing = False
+        if not self.config["history"]:
+            return
+        try:
+            self.history = History(self.config["history_dir"] or None, self.config["history_format"])
+            print(f"🗄️ History in {self.history.directory} "
+                  f"(F10 re-transcribes the last dictation with {self.config['history_retranscribe_model']})")
+        except Exception as e:
+            print(f"History unavailable: {e}")
+    
+    def retranscribe_last(self):
+        # F10: decode the last dictation again with a larger model and swap
+        # it in place if nothing has been typed since it went in
+        if self.history is None or self.last_dictation is None or self.retranscribing:
+            return
+        if self.is_recording or self.pending_jobs:
+            # A dictation landing mid-redo would be what the replace erases
+            print("Dictation in progress, not re-transcribing")
+            self.set_status("Busy", "#8a7a40")
+            return
+        if self.last_dictation[2] is None:
+            self.set_status("Not in history", "#8a7a40")
+            return
+        self.retranscribing = True
+        threading.Thread(target=self.run_retranscription, args=(self.last_dictation,), daemon=True).start()
+    
+    def run_retranscription(self, dictation):
+        text, inserted_at, entry, sequence = dictation
+        name = self.config["history_retranscribe_model"]
+        try:
+            # Exactly the dictation that was typed; if it never made it into
+            # the history there is nothing to redo
+            entry_id = entry.wait()
+            if entry_id is None:
+                print("Last dictation was not saved to history, not re-transcribing")
+                self.after(0, self.set_status, "Not in history", "#cc4455")
+                return
+            self.after(0, self.set_status, f"Redo with {name}...", "#8a7a40")
+            model, _, _ = self.models.get(name)
+            start = time.perf_counter()
+            new_text = self.history.retranscribe(
+                entry_id, model, name, self.transcribe_options, self.config["long_window_s"]
+            )
+            print(f"🔁 Re-transcribed with {name} in {time.perf_counter() - start:.2f}s")
+            if new_text and new_text != text:
+                print(f"✏️ {text} -> {new_text}")
+                
+                def still_valid():
+                    # The text before the cursor is still this dictation:
+                    # nothing typed by the user or inserted by us since
+                    return (self.last_dictation is dictation and self.inserter.sequence == sequence
+                            and self.last_key_time < inserted_at)
+                
+                def replaced(ok):
+                    if ok and self.last_dictation is dictation and self.inserter.sequence == sequence + 1:
+                        self.last_dictation = (new_text, inserted_at, entry, self.inserter.sequence)
+                self.inserter.replace([text], new_text, still_valid)
+                self.inserter.when_done(replaced)
+        except Exception as e:
+            print(f"Re-transcription failed: {e}")
+        finally:
+            self.retranscribing = False
+            self.after(2000, self.show_ready)
+    
+    def show_history_search(self):
+        window = ctk.CTkToplevel(self)
+        window.title("WhisperDrop history")
+        window.geometry("560x360")
+        window.configure(fg_color="#0d0d0d")
+        query = ctk.CTkEntry(window, placeholder_text="Search dictations...")
+        query.pack(fill="x", padx=8, pady=8)
+        results = tk.Listbox(window, bg="#1a1a1a", fg="#c0c0c0", bd=0, highlightthickness=0,
+                             selectbackground="#2a2a4e", selectforeground="#ffffff")
+        results.pack(fill="both", expand=True, padx=8)
+        footer = ctk.CTkLabel(window, text="", text_color="#606060")
+        footer.pack(pady=4)
+        rows = []
+        
+        def search(event=None):
+            start = time.perf_counter()
+            rows[:] = self.history.search(query.get(), 50)
+            results.delete(0, "end")
+            for row in rows:
+                stamp = time.strftime("%m-%d %H:%M", time.localtime(row["created"]))
+                results.insert("end", f"{stamp}  {row['snippet']}")
+            footer.configure(text=f"{len(rows)} hit(s) in {(time.perf_counter() - start) * 1000:.1f} ms "
+                                  f"• double-click copies")
+        
+        def copy(event=None):
+            selection = results.curselection()
+            if selection:
+                self.clipboard_clear()
+                self.clipboard_append(rows[selection[0]]["text"])
+                footer.configure(text="Copied to clipboard")
+        
+        query.bind("<KeyRelease>", search)
+        results.bind("<Double-Button-1>", copy)
+        results.bind("<Return>", copy)
+        window.after(100, query.focus_set)
+    
+    def on_hotkey(self, pressed_at):
+        METRICS.observe("hotkey_to_ui", self.ui_probe.hotkey_handled(pressed_at))
+        self.toggle_recording()
+    
+    def toggle_recording(self):
         if self.is_recording:
             self.stop_recording()
         else:
             self.start_recording()
     
     def start_recording(self):
+        if self.pending_jobs >= self.config["max_pending_jobs"]:
+            print("Transcription queue full, finish pending dictations first")
+            self.status_label.configure(text=f"Busy • {self.pending_jobs} queued", text_color="#8a7a40")
+            return
+        
+        if self.config["spill_after_s"]:
+            self.audio_buffer = SpillBuffer(self.samplerate, self.config["spill_after_s"])
+        else:
+            self.audio_buffer = AudioBuffer(self.samplerate)
+        sink = self.audio_buffer
+        if self.uses_parallel_decoder():
+            self.after(int(self.config["parallel_after_s"] * 1000), self.prefetch_parallel_decoder, self.audio_buffer)
+        if self.config["vad_gate"]:
+            sink = SpeechGate(
+                self.audio_buffer, self.samplerate,
+                threshold=self.config["vad_threshold"],
+                pad_ms=self.config["vad_pad_ms"],
+                auto_stop_s=self.config["vad_auto_stop_s"],
+            )
+            sink.on_silence = lambda gate=sink: self.after(0, lambda: self.auto_stop(gate))
+        
+        if not self.record_audio(sink):
+            if sink is not self.audio_buffer:
+                sink.close()
+            return
+        
         self.is_recording = True
         
+        if self.models.parked(self.model_name):
+            threading.Thread(target=self.ensure_model, daemon=True).start()
+        
         self.record_button.configure(
             text="STOP",
             fg_color="#2a1520",
@@ -279,16 +656,24 @@ class SimpleApp(ctk.CTk):
         
         self.status_label.configure(text="Recording...", text_color="#cc4455")
         
-        self.audio_frames = []
         self.last_levels.clear()
-        
-        self.recording_thread = threading.Thread(target=self.record_audio)
-        self.recording_thread.start()
-        
-        self.audio_monitor_thread = threading.Thread(target=self.monitor_audio_level)
-        self.audio_monitor_thread.start()
+        self.latency_reported = False
+        self.meter_blocks = self.capture.blocks
+        self.meter_frames = 0
+        self.meter_cpu = 0.0
+        self.shown_overflows = 0
+        self.draw_waveform()
+
+        self.streamer = None
+        if self.streaming and self.model_ready.is_set() and self.model is not None:
+            self.streamer = StreamingTranscriber(
+                self.model, self.samplerate, self.config["streaming_window"],
+                max_window=self.config["long_window_s"], **self.transcribe_options
+            )
+            threading.Thread(target=self.stream_audio, args=(self.streamer,), daemon=True).start()
     
     def stop_recording(self):
+        stop_time = time.perf_counter()
         self.is_recording = False
         
         self.record_button.configure(
@@ -299,82 +684,284 @@ class SimpleApp(ctk.CTk):
             border_color="#2a2a4e"
         )
         
+        # A stop and start within one frame would otherwise leave the old
+        # frame clock running next to the new one
+        if self.meter_after is not None:
+            self.after_cancel(self.meter_after)
+            self.meter_after = None
         self.reset_waveform()
+        if self.meter_frames:
+            print(f"🎚️ Meter: {self.meter_frames} frames, "
+                  f"{self.meter_cpu / self.meter_frames * 1e6:.0f} µs UI CPU per frame")
         
-        self.status_label.configure(text="Processing...", text_color="#8a7a40")
+        audio_buffer = self.capture.stop()
+        METRICS.observe("stop_to_buffer", time.perf_counter() - stop_time)
+        health = self.capture.health()
+        print(f"🎙️ Capture: {self.capture.recording_overflows} overflow(s) this recording, "
+              f"jitter p99 {health['jitter_p99_ms']:.1f} / max {health['jitter_max_ms']:.1f} ms, "
+              f"block {health['blocksize'] or 'auto'} @ {health['device_rate']} Hz")
         
-        if hasattr(self, 'recording_thread'):
-            self.recording_thread.join()
-        
-        threading.Thread(target=self.process_audio, daemon=True).start()
+        self.pending_jobs += 1
+        self.jobs.put_nowait((audio_buffer, self.streamer, stop_time))
+        if self.pending_jobs > 1:
+            self.status_label.configure(text=f"Queued • {self.pending_jobs - 1} ahead", text_color="#8a7a40")
+        else:
+            self.status_label.configure(text="Processing...", text_color="#8a7a40")
     
-    def record_audio(self):
+    def transcription_worker(self):
+        # Single consumer: utterances are decoded and inserted strictly in order
+        while True:
+            audio_buffer, streamer, stop_time = self.jobs.get()
+            # A failure here must not kill the only worker, or every later
+            # job would wait forever
+            try:
+                if not self.model_ready.is_set():
+                    self.after(0, self.set_status, "Queued • loading model", "#8a7a40")
+                    self.model_ready.wait()
+                self.ensure_model()
+                METRICS.observe("queue_wait", time.perf_counter() - stop_time)
+                self.after(0, self.set_status, "Processing...", "#8a7a40")
+                self.process_audio(audio_buffer, streamer, stop_time)
+            except Exception as e:
+                METRICS.count("errors")
+                print(f"Transcription job failed: {e}")
+                self.after(0, self.set_status, "Error", "#cc4455")
+                self.discard_recording(audio_buffer)
+            finally:
+                self.after(0, self.job_done)
+    
+    def job_done(self):
+        self.pending_jobs -= 1
+        if self.config["ui_probe"]:
+            print(f"🖥️ {self.ui_probe.report()}")
+    
+    def set_status(self, text, text_color):
+        # The recording indicator wins over updates for earlier utterances
+        if not self.is_recording:
+            self.status_label.configure(text=text, text_color=text_color)
+    
+    def show_ready(self):
+        if self.pending_jobs:
+            self.set_status(f"Processing • {self.pending_jobs} queued", "#8a7a40")
+        else:
+            if self.capture.overflows:
+                self.set_status(f"Ready • {self.device_used} • {self.capture.overflows} overflow(s)", "#8a7a40")
+            else:
+                self.set_status(f"Ready • {self.device_used}", "#606060")
+    
+    def auto_stop(self, gate):
+        if self.is_recording and self.capture.buffer is gate:
+            print("🔇 Trailing silence, stopping")
+            self.stop_recording()
+    
+    def record_audio(self, sink):
         print("🎧 Starting audio recording...")
         try:
-            with sd.InputStream(samplerate=self.samplerate, channels=self.channels, dtype='int16') as stream:
-                while self.is_recording:
-                    audio_chunk, overflowed = stream.read(1024)
-                    self.audio_frames.append(audio_chunk)
-                    self.audio_level = np.abs(audio_chunk).mean()
+            self.capture.start(sink)
+            return True
         except Exception as e:
             print(f"Recording error: {e}")
+            self.capture.stop()
             self.after(0, lambda: self.status_label.configure(text="Mic Error", text_color="#cc4455"))
+            return False
     
-    def monitor_audio_level(self):
+    def stream_audio(self, streamer):
+        audio_buffer = self.audio_buffer
+        interval = int(self.config["streaming_interval"] * self.samplerate)
         while self.is_recording:
-            if self.audio_level > 0:
-                self.after(0, lambda level=self.audio_level: self.update_waveform(level))
-            time.sleep(0.05)
-    
-    def process_audio(self):
-        if not self.audio_frames:
-            self.after(0, lambda: self.status_label.configure(text="No audio", text_color="#cc4455"))
-            return
+            if len(audio_buffer) - streamer.processed < interval:
+                time.sleep(0.05)
+                continue
+            try:
+                # Only the uncommitted window is read back
+                offset = streamer.offset
+                text = streamer.process(audio_buffer.view(offset), offset)
+                print(f"📝 Committed: {text}")
+            except Exception as e:
+                print(f"Streaming error: {e}")
+                return
 
+    def process_audio(self, audio_buffer, streamer=None, stop_time=None):
+        if stop_time is None:
+            stop_time = time.perf_counter()
+        handed_off = False
         try:
-            audio_data = np.concatenate(self.audio_frames, axis=0)
-            audio_float = audio_data.flatten().astype(np.float32) / 32768.0
-
-            segments, info = self.model.transcribe(
-                audio_float,
-                beam_size=1,
-                language="en",
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=300),
-            )
+            if isinstance(audio_buffer, SpeechGate):
+                gate = audio_buffer
+                vad_start = time.perf_counter()
+                audio_buffer = gate.close()
+                METRICS.observe("vad_flush", time.perf_counter() - vad_start)
+                print(f"🔇 VAD kept {audio_buffer.duration():.1f}s of {gate.seen / self.samplerate:.1f}s")
+
+            if not audio_buffer:
+                self.after(0, self.set_status, "No audio", "#cc4455")
+                return
 
-            transcription = " ".join(segment.text.strip() for segment in segments).strip()
+            if self.model is None:
+                self.after(0, self.set_status, "No model", "#cc4455")
+                return
+
+            if self.draft_model is not None and streamer is None:
+                transcription = self.draft_then_refine(audio_buffer, stop_time)
+            else:
+                pieces = transcribe_recording(
+                    self.model, audio_buffer, self.transcribe_options, self.samplerate,
+                    self.config["long_window_s"], streamer, self.parallel_decoder_for(audio_buffer)
+                )
+                transcription = " ".join(self.insert_pieces(pieces, stop_time))
+            decoded = time.perf_counter()
+            self.last_activity = decoded
+            METRICS.observe("stop_to_text", decoded - stop_time)
+            METRICS.observe("first_stop_to_text" if self.first_dictation else "steady_stop_to_text",
+                            decoded - stop_time)
+            self.first_dictation = False
+            first = METRICS.percentile("first_stop_to_text", 0.5)
+            steady = METRICS.percentile("steady_stop_to_text", 0.5)
+            print(f"⏱ Stop-to-text: {decoded - stop_time:.2f}s (first after load p50 "
+                  f"{first or 0:.2f}s, steady p50 {steady or 0:.2f}s)")
 
             if transcription:
-                self.after(0, lambda: self.status_label.configure(text="Inserting...", text_color="#3a7a5a"))
-                self.after(0, lambda: self.insert_text(transcription))
+                entry = None
+                if self.history is not None:
+                    # Encoding and indexing happen on the history thread,
+                    # which also closes a spilled recording once written
+                    release = audio_buffer.close if isinstance(audio_buffer, SpillBuffer) else None
+                    entry = self.history.add(audio_buffer, transcription, self.model_name, release)
+                    handed_off = True
+                
+                def inserted(ok):
+                    now = time.perf_counter()
+                    METRICS.observe("insertion", now - decoded)
+                    METRICS.observe("stop_to_inserted", now - stop_time)
+                    if ok:
+                        # F10 may replace it only while nothing went in after it
+                        self.last_dictation = (transcription, stop_time, entry, self.inserter.sequence)
+                    self.after(0, lambda: self.on_inserted(transcription, ok))
+                self.inserter.when_done(inserted)
             else:
-                self.after(0, lambda: self.status_label.configure(text="No speech", text_color="#404040"))
+                METRICS.count("no_speech")
+                self.after(0, self.set_status, "No speech", "#404040")
 
         except Exception as e:
+            METRICS.count("errors")
             print(f"Processing error: {e}")
-            self.after(0, lambda: self.status_label.configure(text="Error", text_color="#cc4455"))
+            self.after(0, self.set_status, "Error", "#cc4455")
+        finally:
+            if not handed_off:
+                self.discard_recording(audio_buffer)
+    
+    def discard_recording(self, audio_buffer):
+        # Deletes a spilled recording's temp file, also behind a VAD gate
+        if isinstance(audio_buffer, SpeechGate):
+            audio_buffer = audio_buffer.close()
+        if isinstance(audio_buffer, SpillBuffer):
+            audio_buffer.close()
+    
+    def uses_parallel_decoder(self):
+        # Not with a model in another process: the point there is to keep
+        # the weights out of this one
+        return self.config["parallel_after_s"] and not self.config["inference_process"]
+    
+    def parallel_decoder_for(self, audio_buffer):
+        # Long recordings are split at pauses and decoded on all cores
+        if not self.uses_parallel_decoder() or audio_buffer.duration() <= self.config["parallel_after_s"]:
+            return None
+        name = self.model_name + PARALLEL
+        if name not in self.models or self.models.parked(name):
+            self.after(0, self.set_status, "Loading parallel...", "#8a7a40")
+        decoder, _, _ = self.models.get(name)
+        return decoder
+    
+    def prefetch_parallel_decoder(self, audio_buffer):
+        # Load the parallel model while the long recording is still going,
+        # so STOP does not wait for it
+        if self.is_recording and self.audio_buffer is audio_buffer and self.uses_parallel_decoder():
+            name = self.model_name + PARALLEL
+            threading.Thread(target=self.models.get, args=(name,), daemon=True).start()
+    
+    def insert_pieces(self, pieces, stop_time):
+        # Type each segment as soon as it is decoded
+        inserted = []
+        previous = time.perf_counter()
+        for text in pieces:
+            now = time.perf_counter()
+            METRICS.observe("segment_decode", now - previous)
+            previous = now
+            if not inserted:
+                print(f"⏱ Stop-to-first-text: {now - stop_time:.2f}s")
+                METRICS.observe("stop_to_first_text", now - stop_time)
+                self.after(0, self.set_status, "Inserting...", "#3a7a5a")
+            inserted.append(text)
+            self.inserter.insert(text)
+        return inserted
+    
+    def draft_then_refine(self, audio_buffer, stop_time):
+        # The draft model's text goes in right away; the main model's
+        # transcript replaces it in place only if it differs and the user
+        # has not typed anything since the draft went in
+        draft_started = time.perf_counter()
+        draft = self.insert_pieces(transcribe_recording(
+            self.draft_model, audio_buffer, self.transcribe_options, self.samplerate,
+            self.config["long_window_s"]
+        ), stop_time)
+        draft_s = time.perf_counter() - stop_time
+
+        refine_started = time.perf_counter()
+        refined = list(transcribe_recording(
+            self.model, audio_buffer, self.transcribe_options, self.samplerate,
+            self.config["long_window_s"]
+        ))
+        print(f"⏱ Draft ({self.config['draft_model']}): {draft_s:.2f}s, "
+              f"refine ({self.model_name}): {time.perf_counter() - refine_started:.2f}s")
+
+        if not refined:
+            return " ".join(draft)
+        if not draft:
+            return " ".join(self.insert_pieces(refined, stop_time))
+
+        transcription = " ".join(refined)
+        if transcription != " ".join(draft):
+            print(f"✏️ Refining: {' '.join(draft)} -> {transcription}")
+            self.inserter.replace(draft, transcription, lambda: self.last_key_time < draft_started)
+        return transcription
     
     def insert_text(self, text):
-        try:
-            time.sleep(0.3)
-            pyperclip.copy(text + ' ')
-            pyautogui.hotkey('ctrl', 'v')
+        time.sleep(0.3)
+        pyperclip.copy(text + ' ')
+        # Ctrl+V: only the V counts
+        self.inserter.expect_keys(1)
+        pyautogui.hotkey('ctrl', 'v')
+    
+    def delete_text(self, text):
+        self.inserter.expect_keys(len(text) + 1)
+        pyautogui.press('backspace', presses=len(text) + 1)
+    
+    def on_inserted(self, text, ok):
+        if not ok:
+            METRICS.count("failed_insertions")
+            self.set_status("Insert failed", "#cc4455")
+            return
 
-            self.status_label.configure(text="Inserted!", text_color="#3a7a5a")
-            print(f"✅ Inserted: {text}")
+        METRICS.count("dictations")
+        self.set_status("Inserted!", "#3a7a5a")
+        print(f"✅ Inserted: {text}")
 
-            self.after(2000, lambda: self.status_label.configure(
-                text=f"Ready • {self.device_used}",
-                text_color="#606060"
-            ))
-        except Exception as e:
-            print(f"Insert error: {e}")
-            self.status_label.configure(text="Insert failed", text_color="#cc4455")
+        self.after(2000, self.show_ready)
     
     def cleanup(self):
         self.is_recording = False
         
+        try:
+            self.capture.close()
+        except Exception:
+            pass
+        
+        self.models.close()
+        if self.history is not None:
+            self.history.close()
+        if isinstance(self.draft_model, InferenceProcess):
+            self.draft_model.close()
+        
         if hasattr(self, 'keyboard_listener'):
             try:
                 self.keyboard_listener.stop()
@@ -390,7 +977,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--cpu", action="store_true")
     parser.add_argument("--cuda", action="store_true")
-    args = parser.parse_args()
+    parser.add_argument("--transcribe", nargs="+", metavar="PATH",
+                        help="transcribe audio files/directories without the UI and exit")
+    args, extra = parser.parse_known_args()
     
     force_device = None
     if args.cpu:
@@ -398,6 +987,14 @@ if __name__ == "__main__":
     elif args.cuda:
         force_device = "cuda"
     
+    if args.transcribe:
+        # Remaining options (--workers, --batched, --output, ...) go to the batch CLI
+        from transcribe_files import main as transcribe_files
+        device_args = ["--" + force_device] if force_device else []
+        sys.exit(transcribe_files(args.transcribe + device_args + extra))
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    
     app = SimpleApp(force_device=force_device)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
@@ -0,0 +1,179 @@
+import os
+import queue
+import tempfile
+import threading
+
+import numpy as np
+
+
+class AudioBuffer:
+    """Growable float32 arena that the capture callback writes into.
+
+    Capacity doubles when full, so appends are amortised O(1) and ``view``
+    hands the recording to the transcriber without copying it.
+    """
+
+    def __init__(self, samplerate=16000, initial_seconds=30):
+        self.samplerate = samplerate
+        self.data = np.empty(int(samplerate * initial_seconds), dtype=np.float32)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, block):
+        end = self.size + len(block)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=np.float32)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = block
+        self.size = end
+
+    def view(self, start=0, end=None):
+        if end is None:
+            end = self.size
+        return self.data[start:end]
+
+    def duration(self):
+        return self.size / self.samplerate
+
+
+class PreRollRing:
+    """Fixed-size ring holding the most recent audio from a warm stream."""
+
+    def __init__(self, samples):
+        self.data = np.zeros(max(int(samples), 1), dtype=np.float32)
+        self.pos = 0
+        self.filled = 0
+
+    def append(self, block):
+        size = len(self.data)
+        n = len(block)
+        if n >= size:
+            self.data[:] = block[-size:]
+            self.pos = 0
+            self.filled = size
+            return
+        end = self.pos + n
+        if end <= size:
+            self.data[self.pos:end] = block
+        else:
+            split = size - self.pos
+            self.data[self.pos:] = block[:split]
+            self.data[:n - split] = block[split:]
+        self.pos = end % size
+        self.filled = min(self.filled + n, size)
+
+    def snapshot(self):
+        if self.filled < len(self.data):
+            return self.data[:self.filled].copy()
+        return np.concatenate((self.data[self.pos:], self.data[:self.pos]))
+
+    def clear(self):
+        self.pos = 0
+        self.filled = 0
+
+
+class SpillBuffer:
+    """AudioBuffer that moves to a temporary file past ``spill_seconds``.
+
+    Short recordings stay in RAM. Longer ones are handed to a writer thread
+    that appends them to a raw float32 file, so the capture callback only
+    queues blocks and never touches the disk. ``view`` waits for the writer
+    to catch up and reads back through ``np.memmap``, so resident memory
+    stays flat no matter how long the recording runs. Call ``close`` once
+    the audio has been transcribed to delete the file.
+    """
+
+    def __init__(self, samplerate=16000, spill_seconds=300, directory=None):
+        self.samplerate = samplerate
+        self.spill_samples = int(samplerate * spill_seconds)
+        self.directory = directory
+        self.memory = AudioBuffer(samplerate)
+        self.pending = None
+        self.writer = None
+        self.path = None
+        self.map = None
+        self.size = 0
+        self.written = 0
+        self.error = None
+        self.lock = threading.Lock()
+        self.flushed = threading.Condition()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, block):
+        with self.lock:
+            if self.pending is None:
+                self.memory.append(block)
+                if len(self.memory) > self.spill_samples:
+                    self._spill()
+            else:
+                # The block is PortAudio's buffer; the writer gets a copy
+                self.pending.put(np.array(block, dtype=np.float32))
+            self.size += len(block)
+
+    def _spill(self):
+        self.pending = queue.Queue()
+        # The RAM buffer is never appended to again, so the view stays valid
+        self.pending.put(self.memory.view())
+        self.memory = None
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    def _write(self):
+        try:
+            # delete=False semantics: np.memmap reopens the file by name,
+            # which Windows refuses for a delete-on-close temporary file
+            fd, self.path = tempfile.mkstemp(prefix="whisperdrop-", suffix=".f32", dir=self.directory)
+            print(f"💾 Spilling recording to {self.path}")
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    block = self.pending.get()
+                    if block is None:
+                        return
+                    f.write(block)
+                    f.flush()
+                    with self.flushed:
+                        self.written += len(block)
+                        self.flushed.notify_all()
+        except Exception as e:
+            print(f"Spill write failed: {e}")
+            with self.flushed:
+                self.error = e
+                self.flushed.notify_all()
+
+    def view(self, start=0, end=None):
+        with self.lock:
+            if self.pending is None:
+                return self.memory.view(start, end)
+            if end is None:
+                end = self.size
+        with self.flushed:
+            self.flushed.wait_for(lambda: self.written >= end or self.error is not None)
+            if self.error is not None:
+                raise self.error
+            if self.map is None or len(self.map) < end:
+                self.map = np.memmap(self.path, dtype=np.float32, mode='r', shape=(self.written,))
+            # A copy, so no view keeps the mapping (and on Windows the file) open
+            return np.array(self.map[start:end])
+
+    def duration(self):
+        return self.size / self.samplerate
+
+    def close(self):
+        with self.lock:
+            writer, self.writer = self.writer, None
+        if writer is not None:
+            self.pending.put(None)
+            writer.join()
+        with self.flushed:
+            self.map = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                print(f"Could not delete {self.path}: {e}")
+            self.path = None
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3", ".m4a", ".opus")
+
+
+def load_audio(path, samplerate=16000):
+    """Decode an audio file to mono float32 at ``samplerate``."""
+    import soundfile as sf
+    try:
+        audio, rate = sf.read(path, dtype='float32', always_2d=True)
+        audio = audio.mean(axis=1)
+    except sf.LibsndfileError:
+        import librosa
+        audio, rate = librosa.load(path, sr=None, mono=True)
+    if rate != samplerate:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=rate, target_sr=samplerate)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def find_audio_files(paths, extensions=AUDIO_EXTENSIONS):
+    """Expand files and directories (recursively) into a sorted file list."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(extensions)
+                )
+        else:
+            files.append(path)
+    return sorted(files)
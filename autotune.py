@@ -0,0 +1,135 @@
+"""One-shot CPU calibration for the Whisper model.
+
+Benchmarks every viable CTranslate2 compute type and thread count on this
+machine, prints the real-time factor of each, and caches the fastest so
+``load_whisper_model`` uses it on every later launch:
+
+    uv run python autotune.py [--model small] [--clip recording.wav]
+
+The cache is keyed by model, CPU and CTranslate2 version, so moving the
+config to different hardware falls back to the defaults until recalibrated.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+
+TUNING_PATH = os.path.join(os.path.expanduser("~"), ".cache", "whisperdrop", "autotune.json")
+SAMPLERATE = 16000
+
+
+def cpu_name():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def tuning_key(model_name):
+    try:
+        from importlib.metadata import version
+        ct2 = version("ctranslate2")
+    except Exception:
+        ct2 = "unknown"
+    return f"{model_name}|{cpu_name()}|{os.cpu_count()}|ct2-{ct2}"
+
+
+def load_tuning(model_name, path=TUNING_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f).get(tuning_key(model_name))
+    except (OSError, ValueError):
+        return None
+
+
+def save_tuning(model_name, settings, path=TUNING_PATH):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache[tuning_key(model_name)] = settings
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def calibration_clip(seconds=10.0):
+    """Deterministic speech-like signal: harmonic, syllable-rate modulated."""
+    import numpy as np
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLERATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.6)
+    noise = np.random.default_rng(0).normal(0, 0.01, len(t))
+    return (0.1 * voice * envelope + noise).astype(np.float32)
+
+
+def candidate_settings():
+    import ctranslate2
+    import psutil
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    compute_types = [c for c in ("int8", "int8_float32", "float32") if c in supported]
+    physical = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    logical = os.cpu_count() or physical
+    threads = sorted({max(1, physical // 2), physical, logical})
+    return [(c, n) for c in compute_types for n in threads]
+
+
+def main():
+    from config import load_config
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Calibrate CPU inference settings for this machine")
+    parser.add_argument("--model", default=config["model_name"])
+    parser.add_argument("--clip", help="WAV/FLAC to calibrate on (default: built-in synthetic clip)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from faster_whisper import WhisperModel
+
+    if args.clip:
+        from audio_files import load_audio
+        audio = load_audio(args.clip, SAMPLERATE)
+    else:
+        audio = calibration_clip()
+    duration = len(audio) / SAMPLERATE
+    options = dict(beam_size=config["beam_size"], language=config["language"],
+                   vad_filter=False, condition_on_previous_text=False)
+
+    report = []
+    print(f"Calibrating {args.model} on {cpu_name()} with a {duration:.1f}s clip\n")
+    print(f"{'compute_type':<14}{'threads':>8}{'load s':>9}{'latency s':>11}{'RTF':>8}")
+    for compute_type, threads in candidate_settings():
+        start = time.perf_counter()
+        model = WhisperModel(args.model, device="cpu", compute_type=compute_type, cpu_threads=threads)
+        load_s = time.perf_counter() - start
+
+        latencies = []
+        for run in range(args.repeat + 1):
+            start = time.perf_counter()
+            segments, _ = model.transcribe(audio, **options)
+            list(segments)
+            if run:  # the first run only warms up
+                latencies.append(time.perf_counter() - start)
+        del model
+
+        latency = statistics.median(latencies)
+        report.append({"compute_type": compute_type, "cpu_threads": threads,
+                       "load_s": load_s, "latency_s": latency, "rtf": latency / duration})
+        print(f"{compute_type:<14}{threads:>8}{load_s:>9.2f}{latency:>11.3f}{latency / duration:>8.3f}")
+
+    best = min(report, key=lambda r: r["latency_s"])
+    save_tuning(args.model, dict(best, calibrated_at=time.strftime("%Y-%m-%dT%H:%M:%S")))
+    print(f"\n✅ Using {best['compute_type']} with {best['cpu_threads']} threads "
+          f"(RTF {best['rtf']:.3f}), saved to {TUNING_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Headless end-to-end dictation latency benchmark.
+
+Replays WAV fixtures through the app's capture callback, transcription
+pipeline and insertion worker. The microphone (sounddevice) and the text
+injector are replaced by local fakes, so it runs on CPU-only CI boxes.
+Results are printed (or written) as JSON:
+
+    uv run python benchmark.py fixtures/ --models tiny small \\
+        --compute-types int8 float32 --beam-sizes 1 5 --output bench.json
+
+Per run, all times in seconds:
+  buffer_s      capture callbacks for the whole fixture plus the STOP handoff
+  vad_s         a standalone Silero VAD pass over the fixture
+  decode_s      STOP to last segment decoded (includes transcribe's own VAD)
+  rtf           decode_s / audio duration
+  first_text_s  STOP to first segment handed to the inserter
+  insert_s      last segment decoded to insertion queue drained
+
+Per fixture, ``first_decode_s`` (the first run) is reported next to
+``steady_decode_s`` (median of the rest); on the first fixture after a
+load that is the cold first-utterance cost, which ``--warm-up`` removes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import types
+
+SAMPLERATE = 16000
+
+
+class ReplayStream:
+    """Stand-in for sounddevice.InputStream; ``play`` drives the callback."""
+
+    def __init__(self, samplerate, channels, blocksize, dtype, callback, **kwargs):
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+
+    def play(self, audio):
+        for i in range(0, len(audio), self.blocksize):
+            block = audio[i:i + self.blocksize]
+            self.callback(block[:, None], len(block), None, None)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+sys.modules["sounddevice"] = types.SimpleNamespace(InputStream=ReplayStream)
+
+from audio_buffer import AudioBuffer  # noqa: E402
+from audio_files import find_audio_files, load_audio  # noqa: E402
+from capture import AudioCapture  # noqa: E402
+from config import load_config  # noqa: E402
+from inserter import TextInserter  # noqa: E402
+from pipeline import transcribe_recording  # noqa: E402
+from streaming import StreamingTranscriber  # noqa: E402
+from warmup import warm_up  # noqa: E402
+
+
+def run_once(model, audio, transcribe_options, config, streaming):
+    result = {}
+
+    capture = AudioCapture(SAMPLERATE, 1)
+    buffer = AudioBuffer(SAMPLERATE)
+    start = time.perf_counter()
+    capture.start(buffer)
+    capture.stream.play(audio)
+    buffer_s = time.perf_counter() - start
+
+    streamer = None
+    if streaming:
+        # Passes the streaming thread would have made while the user spoke
+        streamer = StreamingTranscriber(model, SAMPLERATE, config["streaming_window"],
+                                        max_window=config["long_window_s"], **transcribe_options)
+        interval = int(config["streaming_interval"] * SAMPLERATE)
+        for end in range(interval, len(buffer) + 1, interval):
+            streamer.process(buffer.view(streamer.offset, end), streamer.offset)
+
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    start = time.perf_counter()
+    get_speech_timestamps(audio, VadOptions(**transcribe_options.get("vad_parameters", {})))
+    result["vad_s"] = time.perf_counter() - start
+
+    typed = []
+    done = threading.Event()
+    inserter = TextInserter(typed.append)
+
+    stop_time = time.perf_counter()
+    buffer = capture.stop()
+    view = buffer.view()
+    result["buffer_s"] = buffer_s + time.perf_counter() - stop_time
+
+    first_text = None
+    for text in transcribe_recording(model, buffer, transcribe_options, SAMPLERATE,
+                                     config["long_window_s"], streamer):
+        if first_text is None:
+            first_text = time.perf_counter() - stop_time
+        inserter.insert(text)
+    decoded = time.perf_counter()
+    inserter.when_done(lambda ok: done.set())
+    done.wait()
+
+    result["decode_s"] = decoded - stop_time
+    result["rtf"] = result["decode_s"] / (len(view) / SAMPLERATE)
+    result["first_text_s"] = first_text
+    result["insert_s"] = time.perf_counter() - decoded
+    result["text"] = " ".join(typed)
+    return result
+
+
+def summarize(runs):
+    summary = {}
+    for key in ("buffer_s", "vad_s", "decode_s", "rtf", "first_text_s", "insert_s"):
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = statistics.median(values) if values else None
+    return summary
+
+
+def environment():
+    import ctranslate2
+    import faster_whisper
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "faster_whisper": faster_whisper.__version__,
+        "ctranslate2": ctranslate2.__version__,
+    }
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="WhisperDrop end-to-end latency benchmark")
+    parser.add_argument("fixtures", nargs="+", help="audio files or directories")
+    parser.add_argument("--models", nargs="+", default=[config["model_name"]])
+    parser.add_argument("--compute-types", nargs="+", default=["int8"])
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[config["beam_size"]])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--streaming", action="store_true",
+                        help="simulate streaming passes during recording")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="run the app's synthetic warm-up after loading each model")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    from faster_whisper import WhisperModel
+
+    fixtures = [(path, load_audio(path, SAMPLERATE)) for path in find_audio_files(args.fixtures)]
+    if not fixtures:
+        parser.error("no fixtures found")
+
+    results = []
+    for model_name in args.models:
+        for compute_type in args.compute_types:
+            start = time.perf_counter()
+            model = WhisperModel(model_name, device=args.device, compute_type=compute_type,
+                                 cpu_threads=args.cpu_threads)
+            load_s = time.perf_counter() - start
+            warm_up_s = None
+
+            for beam_size in args.beam_sizes:
+                transcribe_options = dict(
+                    beam_size=beam_size,
+                    language=config["language"],
+                    vad_filter=True,
+                    vad_parameters=dict(min_silence_duration_ms=300),
+                )
+                if args.warm_up and warm_up_s is None:
+                    warm_up_s = warm_up(model, transcribe_options, SAMPLERATE)
+                for path, audio in fixtures:
+                    runs = [run_once(model, audio, transcribe_options, config, args.streaming)
+                            for _ in range(args.repeat)]
+                    entry = {
+                        "fixture": os.path.basename(path),
+                        "model": model_name,
+                        "compute_type": compute_type,
+                        "beam_size": beam_size,
+                        "streaming": args.streaming,
+                        "audio_s": len(audio) / SAMPLERATE,
+                        "load_s": load_s,
+                        "warm_up_s": warm_up_s,
+                        # The first run after loading is the first utterance
+                        # a user would see; the rest are steady state
+                        "first_decode_s": runs[0]["decode_s"],
+                        "steady_decode_s": (statistics.median(run["decode_s"] for run in runs[1:])
+                                            if runs[1:] else None),
+                        "median": summarize(runs),
+                        "runs": runs,
+                    }
+                    results.append(entry)
+                    print(f"{entry['fixture']} {model_name}/{compute_type}/beam={beam_size}: "
+                          f"decode {entry['median']['decode_s']:.2f}s "
+                          f"(first {entry['first_decode_s']:.2f}s, "
+                          f"steady {entry['steady_decode_s'] or 0:.2f}s), "
+                          f"RTF {entry['median']['rtf']:.3f}", file=sys.stderr)
+            del model
+
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
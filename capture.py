@@ -0,0 +1,183 @@
+import threading
+import time
+
+import numpy as np
+
+from audio_buffer import PreRollRing
+from metrics import Histogram
+from resampler import StreamingResampler
+
+MAX_BLOCKSIZE = 16384
+
+
+class AudioCapture:
+    """Callback-driven microphone capture.
+
+    PortAudio calls ``_callback`` from its own thread with float32 blocks;
+    each block is mixed down, metered (RMS and peak) and appended to the
+    current ``AudioBuffer`` in one pass, with no Python read loop in between.
+
+    In warm mode (``open``) the stream stays open between recordings and
+    feeds a small pre-roll ring, so ``start`` begins from audio that was
+    already captured instead of waiting for the audio server.
+
+    With ``native_rate`` the device is opened at its own default rate and
+    block size, and each block is resampled to ``samplerate`` here.
+
+    Every callback also accounts for the stream's health: PortAudio's
+    overflow/underflow flags are counted and the gap between callbacks is
+    compared with the block's duration (``jitter``). After an overflow the
+    next stream is opened with twice the block size and matching latency,
+    since an overflow means the callback was not scheduled in time. The
+    stream is never reopened mid-recording, which would drop audio itself.
+    """
+
+    def __init__(self, samplerate=16000, channels=1, blocksize=1024, preroll_ms=500, native_rate=False):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.native_rate = native_rate
+        self.device_rate = samplerate
+        self.resampler = None
+        self.stream_blocksize = blocksize
+        self.latency = None
+        self.overflows = 0
+        self.underflows = 0
+        self.jitter = Histogram()
+        self.last_callback = None
+        self.adapt_pending = False
+        self.overflows_at_start = 0
+        self.recording_overflows = 0
+        self.preroll = PreRollRing(samplerate * preroll_ms // 1000)
+        self.lock = threading.Lock()
+        self.buffer = None
+        self.stream = None
+        self.warm = False
+        self.rms = 0.0
+        self.peak = 0.0
+        self.blocks = 0
+        self.started_at = 0.0
+        self.open_latency = None
+        self.start_latency = None
+
+    def _callback(self, indata, frames, time_info, status):
+        now = time.perf_counter()
+        if self.last_callback is not None:
+            self.jitter.observe(abs(now - self.last_callback - frames / self.device_rate))
+        self.last_callback = now
+        if status:
+            if status.input_overflow:
+                self.overflows += 1
+                self.adapt_pending = True
+            if status.input_underflow:
+                self.underflows += 1
+
+        block = indata[:, 0] if self.channels == 1 else indata.mean(axis=1)
+        if self.resampler is not None:
+            block = self.resampler.process(block)
+            if not len(block):
+                return
+        # Meter values for the UI, computed here once per block
+        self.rms = float(np.sqrt(np.dot(block, block) / len(block)))
+        self.peak = float(max(block.max(), -block.min()))
+        self.blocks += 1
+        with self.lock:
+            if self.buffer is None:
+                self.preroll.append(block)
+                return
+            if self.start_latency is None:
+                self.start_latency = time.perf_counter() - self.started_at
+            self.buffer.append(block)
+
+    def _open_stream(self):
+        import sounddevice as sd
+        rate, blocksize = self.samplerate, self.blocksize
+        if self.native_rate:
+            # blocksize 0 lets PortAudio use the host's preferred buffer size
+            rate, blocksize = int(sd.query_devices(kind="input")["default_samplerate"]), 0
+        if self.latency is not None:
+            blocksize = self.stream_blocksize
+        self.device_rate = rate
+        self.stream_blocksize = blocksize
+        self.last_callback = None
+        self.resampler = StreamingResampler(rate, self.samplerate) if rate != self.samplerate else None
+        self.stream = sd.InputStream(
+            samplerate=rate,
+            channels=self.channels,
+            blocksize=blocksize,
+            dtype='float32',
+            latency=self.latency or 'high',
+            callback=self._callback,
+        )
+        self.stream.start()
+
+    def _adapt(self):
+        """Double the block size (or pick one if the host chose it) and ask
+        PortAudio for enough latency to buffer two blocks."""
+        self.adapt_pending = False
+        previous = self.stream_blocksize
+        if previous >= MAX_BLOCKSIZE:
+            return
+        self.stream_blocksize = min(previous * 2 if previous else 2048, MAX_BLOCKSIZE)
+        self.latency = 2 * self.stream_blocksize / self.device_rate
+        print(f"⚠️ Input overflow: block {previous or 'auto'} -> {self.stream_blocksize} frames, "
+              f"latency {self.latency * 1000:.0f} ms")
+
+    def health(self):
+        """Counters and callback jitter since the app started."""
+        return {
+            "overflows": self.overflows,
+            "underflows": self.underflows,
+            "jitter_p99_ms": (self.jitter.percentile(0.99) or 0.0) * 1000,
+            "jitter_max_ms": self.jitter.max * 1000,
+            "blocksize": self.stream_blocksize,
+            "device_rate": self.device_rate,
+        }
+
+    def _close_stream(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            finally:
+                self.stream = None
+
+    def open(self):
+        """Keep the input stream open for the life of the app."""
+        if self.stream is None:
+            self._open_stream()
+        self.warm = True
+
+    def close(self):
+        self.warm = False
+        self._close_stream()
+
+    def start(self, buffer):
+        self.started_at = time.perf_counter()
+        self.overflows_at_start = self.overflows
+        self.rms = self.peak = 0.0
+        if self.warm and self.stream is not None:
+            with self.lock:
+                buffer.append(self.preroll.snapshot())
+                self.preroll.clear()
+                self.start_latency = time.perf_counter() - self.started_at
+                self.buffer = buffer
+            self.open_latency = 0.0
+            return
+        self.start_latency = None
+        self.buffer = buffer
+        self._open_stream()
+        self.open_latency = time.perf_counter() - self.started_at
+
+    def stop(self):
+        with self.lock:
+            buffer, self.buffer = self.buffer, None
+        self.recording_overflows = self.overflows - self.overflows_at_start
+        if self.adapt_pending:
+            self._adapt()
+            if self.warm:
+                self._close_stream()
+                self._open_stream()
+        if not self.warm:
+            self._close_stream()
+        return buffer
@@ -0,0 +1,88 @@
+"""Stress test for microphone capture under CPU saturation.
+
+Records from the default input device ``--rounds`` times while every core
+runs a busy loop (plus ``--gil-threads`` pure-Python threads in this
+process, competing with the audio callback for the GIL), then checks that
+no samples were dropped: PortAudio reported no overflow and the buffer
+holds as many samples as the wall clock says it should. Overflows make
+``AudioCapture`` grow its block size for the next round, so the rounds
+show whether adaptation recovers:
+
+    uv run python capture_stress.py [--seconds 10] [--rounds 3] [--native-rate]
+
+Exits with status 1 if the last round still lost audio.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from audio_buffer import AudioBuffer
+from capture import AudioCapture
+
+SAMPLERATE = 16000
+
+
+def burn(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(10000))
+
+
+def record_round(capture, seconds):
+    buffer = AudioBuffer(SAMPLERATE, seconds + 5)
+    capture.start(buffer)
+    while capture.start_latency is None:
+        time.sleep(0.001)
+    first_audio = capture.started_at + capture.start_latency
+    time.sleep(seconds)
+    stopped = time.perf_counter()
+    buffer = capture.stop()
+    expected = (stopped - first_audio) * SAMPLERATE
+    return len(buffer), expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that capture drops no samples while the CPU is saturated")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="busy-loop processes")
+    parser.add_argument("--gil-threads", type=int, default=2, help="busy-loop threads in this process")
+    parser.add_argument("--native-rate", action="store_true", help="capture at the device rate and resample")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    workers = [context.Process(target=burn, args=(stop,), daemon=True) for _ in range(args.processes)]
+    threads = [threading.Thread(target=burn, args=(stop,), daemon=True) for _ in range(args.gil_threads)]
+    for worker in workers + threads:
+        worker.start()
+
+    capture = AudioCapture(SAMPLERATE, 1, native_rate=args.native_rate)
+    print(f"{args.processes} busy processes, {args.gil_threads} busy threads, "
+          f"{args.rounds} x {args.seconds:.0f} s\n")
+    print(f"{'round':>5}{'block':>7}{'overflows':>11}{'missing':>9}{'jitter p99 ms':>15}{'max ms':>8}")
+    lost = False
+    try:
+        for round_number in range(1, args.rounds + 1):
+            blocksize = capture.stream_blocksize or "auto"
+            got, expected = record_round(capture, args.seconds)
+            health = capture.health()
+            # Allow for the block still in flight when the stream stopped
+            slack = max(capture.stream_blocksize, 2048) * SAMPLERATE / capture.device_rate
+            missing = max(int(expected - got), 0)
+            lost = capture.recording_overflows > 0 or missing > slack
+            print(f"{round_number:>5}{blocksize:>7}{capture.recording_overflows:>11}{missing:>9}"
+                  f"{health['jitter_p99_ms']:>15.2f}{health['jitter_max_ms']:>8.2f}")
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    print("\nFAIL: audio was dropped in the last round" if lost else "\nOK: no samples dropped")
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+import os
+
+CONFIG_PATH = os.environ.get(
+    "WHISPERDROP_CONFIG",
+    os.path.join(os.path.expanduser("~"), ".config", "whisperdrop", "config.json"),
+)
+
+DEFAULTS = {
+    "model_name": "small",
+    "language": "en",
+    "beam_size": 1,
+    # Decode in a child process (audio passed via shared memory) so the UI
+    # never waits on the model and a crash only restarts the child
+    "inference_process": False,
+    # Sample Tk main-loop lateness at 50 Hz and print it, with hotkey-to-UI
+    # latency, after every dictation
+    "ui_probe": False,
+    # Run a short synthetic decode and VAD pass before showing "Ready"; with
+    # keep_warm_min > 0, repeat it after that many idle minutes so the
+    # weights are not paged out
+    "warm_up": True,
+    "keep_warm_min": 0,
+    # Models offered by right-click menu / cycled with F9. Loaded ones stay
+    # resident (least recently used unloaded first beyond model_ram_budget_mb)
+    # and are unloaded after model_idle_unload_min idle minutes (0 = never),
+    # reloading quickly on next use
+    "swap_models": ["tiny", "base", "small", "medium"],
+    "model_ram_budget_mb": 4000,
+    "model_idle_unload_min": 0,
+    # Optional fast model ("tiny"/"base") whose draft is typed immediately and
+    # then replaced in place by model_name's transcript if that differs
+    "draft_model": None,
+    # Decode while recording and commit stable prefixes (LocalAgreement-2)
+    "streaming": False,
+    "streaming_interval": 1.0,
+    "streaming_window": 15.0,
+    # Keep the microphone open and start recordings from a pre-roll buffer
+    "warm_mic": False,
+    "preroll_ms": 500,
+    # Open the microphone at its native rate and resample to 16 kHz in-process
+    "capture_native_rate": True,
+    # Run Silero VAD while recording and keep only speech (plus padding);
+    # vad_auto_stop_s > 0 stops the recording after that much trailing silence
+    "vad_gate": False,
+    "vad_threshold": 0.5,
+    "vad_pad_ms": 300,
+    "vad_auto_stop_s": 0,
+    # Recordings longer than spill_after_s move to a memory-mapped temp file
+    # (0 keeps everything in RAM); recordings longer than long_window_s are
+    # transcribed one window at a time
+    "spill_after_s": 300,
+    "long_window_s": 120,
+    # Recordings longer than this many seconds are split at pauses and
+    # decoded concurrently on parallel_workers model replicas (0 = by core
+    # count); set parallel_after_s to 0 to always decode sequentially
+    "parallel_after_s": 300,
+    "parallel_workers": 0,
+    # Linux text injection: "xtest" (in-process) or "xdotool". Segments are
+    # inserted as they are decoded, and a segment longer than
+    # insert_paste_threshold characters is pasted via the clipboard
+    "insert_backend": "xtest",
+    "insert_paste_threshold": 300,
+    # Recordings waiting to be transcribed before F8 refuses to start another
+    "max_pending_jobs": 4,
+    # Use a running model_server.py daemon instead of loading the model here.
+    # The socket defaults to $XDG_RUNTIME_DIR/whisperdrop.sock; only a daemon
+    # run by this user (or a uid in model_server_trusted_uids) is used
+    "model_server": False,
+    "model_server_socket": "",
+    "model_server_trusted_uids": [],
+    # Keep every dictation's audio (flac or opus) and transcript in a searchable
+    # history (history_dir, default ~/.local/share/whisperdrop/history); F10
+    # re-transcribes the last dictation with history_retranscribe_model
+    "history": False,
+    "history_dir": "",
+    "history_format": "flac",
+    "history_retranscribe_model": "medium",
+    # Per-stage latency histograms: Prometheus text on 127.0.0.1:metrics_port
+    # (0 = off) and/or a JSONL snapshot appended every metrics_dump_s seconds
+    "metrics_port": 0,
+    "metrics_jsonl": "",
+    "metrics_dump_s": 60,
+    # Serve the loaded model to other local tools over HTTP/WebSocket on
+    # 127.0.0.1; concurrent requests are decoded together in batches
+    "api_server": False,
+    "api_port": 8765,
+    "api_batch_size": 8,
+    "api_max_wait_ms": 20,
+}
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULTS)
+    try:
+        with open(path) as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Config error ({path}): {e}")
+    return config
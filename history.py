@@ -0,0 +1,282 @@
+"""Dictation history: compressed audio plus a full-text index.
+
+With ``history`` enabled every dictation's audio is written as FLAC (or
+Opus) next to a SQLite database whose FTS5 index covers the transcripts.
+``History.add`` only queues the recording; encoding and the database
+insert happen on a background writer thread, so the dictation itself
+never waits on disk. Search and re-transcribe from the command line:
+
+    uv run python history.py search "quarterly budget"
+    uv run python history.py retranscribe 1234 --model medium
+    uv run python history.py bench --entries 50000
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "whisperdrop", "history")
+FORMATS = {"flac": ("FLAC", "PCM_16"), "opus": ("OGG", "OPUS")}
+WRITE_CHUNK_S = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    duration REAL NOT NULL,
+    model TEXT,
+    audio TEXT,
+    text TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO transcripts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF text ON entries BEGIN
+    INSERT INTO transcripts(transcripts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO transcripts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    # WAL lets searches read while the writer thread inserts
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def match_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last
+    one as a prefix so results update while typing."""
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+class Entry:
+    """Handle for a queued recording; the writer fills in its row ``id``."""
+
+    def __init__(self):
+        self.id = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """The row id once written, or None if the write failed."""
+        self.done.wait(timeout)
+        return self.id
+
+
+class History:
+    def __init__(self, directory=None, audio_format="flac"):
+        self.directory = directory or HISTORY_DIR
+        self.format = audio_format
+        os.makedirs(os.path.join(self.directory, "audio"), exist_ok=True)
+        self.path = os.path.join(self.directory, "history.db")
+        self.local = threading.local()
+        connect(self.path).close()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    @property
+    def db(self):
+        # One connection per thread: sqlite3 connections are not shared
+        if not hasattr(self.local, "db"):
+            self.local.db = connect(self.path)
+        return self.local.db
+
+    def add(self, audio_buffer, text, model_name, release=None):
+        """Queue a recording for storage and return its ``Entry`` at once.
+
+        ``audio_buffer`` must not be reused by the caller; ``release`` (e.g.
+        a ``SpillBuffer``'s ``close``) is called once it has been written.
+        """
+        entry = Entry()
+        self.queue.put_nowait((time.time(), audio_buffer, text, model_name, release, entry))
+        return entry
+
+    def wait(self):
+        """Block until every queued recording has been written."""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=10)
+
+    def _writer(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            created, audio_buffer, text, model_name, release, entry = item
+            try:
+                start = time.perf_counter()
+                audio = self._write_audio(created, audio_buffer)
+                with self.db:
+                    entry.id = self.db.execute(
+                        "INSERT INTO entries (created, duration, model, audio, text) VALUES (?, ?, ?, ?, ?)",
+                        (created, audio_buffer.duration(), model_name, audio, text),
+                    ).lastrowid
+                print(f"🗄️ Saved to history in {time.perf_counter() - start:.2f}s (off the hot path)")
+            except Exception as e:
+                print(f"History write failed: {e}")
+            finally:
+                if release is not None:
+                    release()
+                entry.done.set()
+                self.queue.task_done()
+
+    def _write_audio(self, created, audio_buffer):
+        import soundfile as sf
+        container, subtype = FORMATS[self.format]
+        stamp = time.localtime(created)
+        name = os.path.join(
+            time.strftime("%Y-%m", stamp),
+            time.strftime("%Y%m%d-%H%M%S", stamp) + f"-{int(created * 1000) % 1000:03d}.{self.format}",
+        )
+        path = os.path.join(self.directory, "audio", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Encode a minute at a time so spilled recordings are never fully loaded
+        chunk = WRITE_CHUNK_S * audio_buffer.samplerate
+        with sf.SoundFile(path, "w", audio_buffer.samplerate, 1, subtype, format=container) as f:
+            for start in range(0, len(audio_buffer), chunk):
+                f.write(audio_buffer.view(start, min(start + chunk, len(audio_buffer))))
+        return name
+
+    def search(self, text, limit=20):
+        """Newest matches first, each with a highlighted snippet.
+
+        Newest-first lets FTS5 walk its doclists backwards and stop after
+        ``limit`` hits; ranking by relevance would score every match, which
+        takes 100+ ms for common words at tens of thousands of entries.
+        """
+        query = match_query(text)
+        if not query:
+            return []
+        return self.db.execute(
+            "SELECT entries.id, entries.created, entries.duration, entries.model, entries.text, "
+            "snippet(transcripts, 0, '[', ']', '…', 12) AS snippet "
+            "FROM transcripts JOIN entries ON entries.id = transcripts.rowid "
+            "WHERE transcripts MATCH ? ORDER BY transcripts.rowid DESC LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    def get(self, entry_id):
+        return self.db.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchone()
+
+    def audio_path(self, entry):
+        return os.path.join(self.directory, "audio", entry["audio"])
+
+    def retranscribe(self, entry_id, model, model_name, options, long_window_s=300):
+        """Decode a stored recording again and keep the new transcript."""
+        from audio_buffer import AudioBuffer
+        from audio_files import load_audio
+        from pipeline import transcribe_recording
+
+        entry = self.get(entry_id)
+        audio = load_audio(self.audio_path(entry), 16000)
+        buffer = AudioBuffer(16000, len(audio) / 16000 + 1)
+        buffer.append(audio)
+        text = " ".join(transcribe_recording(model, buffer, options, 16000, long_window_s))
+        if text:
+            with self.db:
+                self.db.execute("UPDATE entries SET text = ?, model = ? WHERE id = ?", (text, model_name, entry_id))
+        return text
+
+
+def print_entries(rows):
+    for row in rows:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"]))
+        print(f"{row['id']:>7}  {created}  {row['duration']:>6.1f}s  {row['model'] or '':<8} {row['snippet']}")
+
+
+def bench(entries, searches=300):
+    """Time searches over ``entries`` synthetic transcripts whose words
+    follow a Zipf distribution over a 20k-word vocabulary, like speech."""
+    import itertools
+    import random
+    rng = random.Random(0)
+    vocabulary = ["".join(rng.choices("etaoinshrdlucmfwypvbgk", k=rng.randint(2, 9))) for _ in range(20000)]
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    with tempfile.TemporaryDirectory() as directory:
+        history = History(directory)
+        start = time.perf_counter()
+        with history.db:
+            history.db.executemany(
+                "INSERT INTO entries (created, duration, model, audio, text) VALUES (?, ?, ?, ?, ?)",
+                ((time.time(), 5.0, "small", None,
+                  " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(8, 60))))
+                 for _ in range(entries)),
+            )
+        print(f"Indexed {entries} entries in {time.perf_counter() - start:.2f}s")
+        timings = []
+        for _ in range(searches):
+            query = " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(1, 3)))
+            start = time.perf_counter()
+            history.search(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"Search p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms")
+        history.close()
+
+
+def main():
+    from config import load_config
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Search and re-transcribe the dictation history")
+    parser.add_argument("--dir", default=config["history_dir"] or HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="full-text search of past dictations")
+    search.add_argument("query", nargs="+")
+    search.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="print one dictation and its audio file")
+    show.add_argument("id", type=int)
+    redo = commands.add_parser("retranscribe", help="decode a dictation again with another model")
+    redo.add_argument("id", type=int)
+    redo.add_argument("--model", default=config["history_retranscribe_model"])
+    redo.add_argument("--cpu", action="store_true")
+    load = commands.add_parser("bench", help="time searches over synthetic entries")
+    load.add_argument("--entries", type=int, default=50000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(args.entries)
+        return
+
+    history = History(args.dir, config["history_format"])
+    if args.command == "search":
+        start = time.perf_counter()
+        rows = history.search(" ".join(args.query), args.limit)
+        elapsed = time.perf_counter() - start
+        print_entries(rows)
+        print(f"{len(rows)} hit(s) in {elapsed * 1000:.1f} ms")
+    elif args.command == "show":
+        entry = history.get(args.id)
+        if entry is None:
+            parser.exit(1, f"No entry {args.id}\n")
+        print(entry["text"])
+        print(history.audio_path(entry))
+    else:
+        from models import load_whisper_model
+        model, device = load_whisper_model(args.model, "cpu" if args.cpu else None)
+        options = dict(beam_size=config["beam_size"], language=config["language"], vad_filter=True)
+        start = time.perf_counter()
+        text = history.retranscribe(args.id, model, args.model, options, config["long_window_s"])
+        print(f"{args.model} on {device} in {time.perf_counter() - start:.2f}s:\n{text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Whisper inference in a child process.
+
+``InferenceProcess`` stands in for a WhisperModel, as ``ModelClient`` does
+for the daemon, so decoding never holds the UI process's GIL and a crash
+in CTranslate2 (or an OOM kill) only takes down the child. Audio is copied
+once into a reusable ``multiprocessing.shared_memory`` block instead of
+being pickled; each segment is sent back over a pipe as soon as it is
+decoded, so the caller can insert text while the rest is still decoding.
+A child that dies before decoding starts is restarted and the request
+retried once.
+"""
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from model_server import Info, segment_from_dict, segment_to_dict
+
+
+def transcribe_shared(model, block, size, options, conn):
+    """Send ``{"info"}``, then one ``{"segment"}`` per decoded segment and
+    ``{"end"}`` last."""
+    # Keep every view of the shared block local so it can be closed later
+    audio = np.ndarray(size, dtype=np.float32, buffer=block.buf)
+    segments, info = model.transcribe(audio, **options)
+    conn.send({"info": {"language": info.language, "duration": info.duration}})
+    for segment in segments:
+        conn.send({"segment": segment_to_dict(segment)})
+    conn.send({"end": True})
+
+
+def serve(conn, model_name, force_device, load_kwargs):
+    """Child process main loop: load the model, then answer requests."""
+    from models import load_whisper_model
+    try:
+        model, device_used = load_whisper_model(model_name, force_device, **load_kwargs)
+    except Exception as e:
+        conn.send({"error": str(e)})
+        return
+    conn.send({"device": device_used})
+
+    block = None
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        name, size, options = request
+        try:
+            if block is None or block.name != name:
+                if block is not None:
+                    block.close()
+                block = shared_memory.SharedMemory(name=name)
+            transcribe_shared(model, block, size, options, conn)
+        except Exception as e:
+            conn.send({"error": str(e)})
+    if block is not None:
+        block.close()
+
+
+class InferenceProcess:
+    """``WhisperModel.transcribe`` served by a restartable child process."""
+
+    def __init__(self, model_name, force_device=None, **load_kwargs):
+        self.model_name = model_name
+        self.force_device = force_device
+        self.load_kwargs = load_kwargs
+        self.context = mp.get_context("spawn")
+        self.lock = threading.Lock()
+        self.block = None
+        self.process = None
+        self.conn = None
+        self.device = None
+        self.restarts = 0
+        # Token of the request whose segments are still being sent
+        self.stream = None
+        self._start()
+
+    def _start(self):
+        self.conn, child = self.context.Pipe()
+        self.process = self.context.Process(
+            target=serve, args=(child, self.model_name, self.force_device, self.load_kwargs),
+            name=f"whisper-{self.model_name}", daemon=True,
+        )
+        self.process.start()
+        child.close()
+        try:
+            reply = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"Inference process exited while loading (code {self.process.exitcode})")
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        self.device = reply["device"]
+        print(f"🧩 Inference process for {self.model_name} ready (pid {self.process.pid})")
+
+    def _stop(self):
+        self.stream = None
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+    def _request(self, audio, options):
+        # The child reads the shared block until its last segment, so the
+        # previous stream must be finished before the block is touched
+        self._finish_stream()
+        if self.block is None or self.block.size < audio.nbytes:
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+            # Room for 30 s at least, doubling so long recordings rarely reallocate
+            size = max(audio.nbytes, 2 * (self.block.size if self.block else 0), 30 * 16000 * 4)
+            self.block = shared_memory.SharedMemory(create=True, size=size)
+        np.ndarray(len(audio), dtype=np.float32, buffer=self.block.buf)[:] = audio
+        self.conn.send((self.block.name, len(audio), options))
+        return self.conn.recv()
+
+    def _finish_stream(self):
+        # Skip the rest of a stream whose caller stopped reading it
+        if self.stream is not None:
+            self.stream = None
+            while "segment" in self.conn.recv():
+                pass
+
+    def transcribe(self, audio, **options):
+        """Like ``WhisperModel.transcribe``: segments are yielded lazily, as
+        the child decodes them."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        with self.lock:
+            for attempt in range(2):
+                if self.process is None or not self.process.is_alive():
+                    self._restart()
+                try:
+                    reply = self._request(audio, options)
+                    break
+                except (EOFError, OSError):
+                    self.process.join(timeout=1)
+                    print(f"💥 Inference process died (exit code {self.process.exitcode})")
+                    self._restart()
+            else:
+                raise RuntimeError("Inference process crashed twice on this audio")
+            if "error" in reply:
+                raise RuntimeError(reply["error"])
+            self.stream = token = object()
+        return self._segments(token), Info(**reply["info"])
+
+    def _segments(self, token):
+        while True:
+            with self.lock:
+                if self.stream is not token:
+                    # A later request already skipped the rest
+                    return
+                try:
+                    reply = self.conn.recv()
+                except (EOFError, OSError):
+                    self.stream = None
+                    raise RuntimeError(f"Inference process died while decoding (exit code {self.process.exitcode})")
+                if "segment" not in reply:
+                    self.stream = None
+            if "error" in reply:
+                raise RuntimeError(reply["error"])
+            if "segment" not in reply:
+                return
+            yield segment_from_dict(reply["segment"])
+
+    def _restart(self):
+        if self.process is not None:
+            self.restarts += 1
+            print(f"🔄 Restarting inference process for {self.model_name} (restart {self.restarts})")
+            self._stop()
+        self._start()
+
+    # The model cache parks a process by stopping it and reloads by restarting
+
+    def is_loaded(self):
+        return self.process is not None
+
+    def unload(self):
+        with self.lock:
+            self._stop()
+
+    def reload(self):
+        with self.lock:
+            if self.process is None:
+                self._start()
+
+    def memory_mb(self):
+        import psutil
+        if self.process is None:
+            return 0.0
+        return psutil.Process(self.process.pid).memory_info().rss / 2**20
+
+    def close(self):
+        with self.lock:
+            self._stop()
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+                self.block = None
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+
+class TextInserter:
+    """Types text on a dedicated worker thread, strictly in submission order.
+
+    Lets decoding of the next segment overlap with typing of the previous
+    one. ``when_done`` queues a callback that runs once everything submitted
+    before it has been typed, and reports the typing throughput since the
+    previous callback. ``replace`` swaps already typed pieces for new text
+    using ``delete_text``, the backend's inverse of ``type_text``.
+    ``sequence`` counts the texts typed so far, so a caller can tell
+    whether anything went in after a given piece.
+
+    Global key listeners see injected key events late, on their own thread,
+    often after ``type_text`` has returned. Backends announce each key press
+    they are about to inject with ``expect_keys`` and listeners claim one
+    per event with ``injected_key``, so the user's own keys are never
+    mistaken for ours, however close together the two arrive.
+    """
+
+    def __init__(self, type_text, delete_text=None):
+        self.type_text = type_text
+        self.delete_text = delete_text
+        self.queue = queue.Queue()
+        self.failed = False
+        self.typing = False
+        self.keys_lock = threading.Lock()
+        self.expected_keys = 0
+        self.sequence = 0
+        self.chars = 0
+        self.seconds = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def insert(self, text):
+        self.queue.put(text)
+
+    def replace(self, old_pieces, new_text, still_valid=None):
+        """Erase ``old_pieces`` and type ``new_text`` in their place.
+
+        ``still_valid`` is checked right before erasing; returning False
+        (e.g. the user has typed since) leaves the old text alone.
+        """
+        self.queue.put((list(old_pieces), new_text, still_valid))
+
+    def when_done(self, callback):
+        self.queue.put(callback)
+
+    def expect_keys(self, count):
+        """Called right before injecting ``count`` non-modifier key presses."""
+        with self.keys_lock:
+            self.expected_keys += count
+
+    def forget_keys(self):
+        # After a failed injection the count no longer matches what will
+        # arrive; erring towards "the user typed" only skips a replace
+        with self.keys_lock:
+            self.expected_keys = 0
+
+    def injected_key(self):
+        """Claim one expected press; False means the key is the user's."""
+        with self.keys_lock:
+            if self.expected_keys <= 0:
+                return False
+            self.expected_keys -= 1
+            return True
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if callable(item):
+                if self.seconds > 0:
+                    print(f"⌨️ Typed {self.chars} chars in {self.seconds * 1000:.0f} ms "
+                          f"({self.chars / self.seconds:.0f} chars/s)")
+                ok, self.failed = not self.failed, False
+                self.chars, self.seconds = 0, 0.0
+                item(ok)
+                continue
+
+            if isinstance(item, tuple) and item[2] is not None and not item[2]():
+                print("✋ Text changed since it was typed, keeping it")
+                continue
+
+            start = time.perf_counter()
+            self.typing = True
+            try:
+                if isinstance(item, tuple):
+                    old_pieces, item = item[0], item[1]
+                    for piece in reversed(old_pieces):
+                        self.delete_text(piece)
+                self.type_text(item)
+                self.chars += len(item)
+            except Exception as e:
+                print(f"Insert error: {e}")
+                self.failed = True
+                self.forget_keys()
+            finally:
+                self.sequence += 1
+                self.typing = False
+            self.seconds += time.perf_counter() - start
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def find_cut(audio, samplerate, search_s=5.0, frame_ms=100):
+    """Return the index of the quietest frame in the last ``search_s`` seconds."""
+    frame = samplerate * frame_ms // 1000
+    tail_start = max(len(audio) - int(search_s * samplerate), 0)
+    count = (len(audio) - tail_start) // frame
+    if count == 0:
+        return len(audio)
+    tail = audio[tail_start:tail_start + count * frame].reshape(count, frame)
+    energy = np.einsum('ij,ij->i', tail, tail)
+    return tail_start + int(np.argmin(energy)) * frame + frame // 2
+
+
+def iter_windows(buffer, samplerate, window_s):
+    """Yield (start, end) sample ranges of at most ``window_s`` seconds,
+    cut at quiet points so words are not split between windows."""
+    total = len(buffer)
+    window = int(window_s * samplerate)
+    start = 0
+    while start < total:
+        end = min(start + window, total)
+        if end < total:
+            end = start + find_cut(buffer.view(start, end), samplerate)
+        yield start, end
+        start = end
+
+
+def transcribe_windows(model, buffer, samplerate=16000, window_s=120, **options):
+    """Transcribe a long recording one bounded window at a time.
+
+    Only one window of audio (and its features) is materialised at once,
+    which keeps memory flat for spilled, memory-mapped recordings. The tail
+    of the previous window's text is passed on as the prompt.
+    """
+    previous = ""
+    for start, end in iter_windows(buffer, samplerate, window_s):
+        segments, _ = model.transcribe(
+            buffer.view(start, end),
+            initial_prompt=previous[-200:] or None,
+            **options,
+        )
+        for segment in segments:
+            previous += segment.text
+            yield segment
@@ -0,0 +1,171 @@
+"""Per-stage dictation latency histograms.
+
+Each stage of a dictation (hotkey, stream open, first audio, stop, queue
+wait, VAD, every decoded segment, insertion) records its duration into a
+fixed-size histogram with geometric buckets from 1 ms to about 2 min, so
+memory stays constant however long the app runs. Snapshots report
+p50/p95/p99 per stage and are exposed as Prometheus text on 127.0.0.1
+(``metrics_port``) and/or appended to a JSONL file every
+``metrics_dump_s`` seconds (``metrics_jsonl``). Both carry the raw bucket
+counts, so histograms from many workstations can be summed before taking
+fleet-wide percentiles. Capture callback jitter and overflow counts are
+kept by ``AudioCapture`` itself and exported here through ``attach`` and
+``watch``, so the audio thread never takes this module's lock.
+"""
+import bisect
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = tuple(round(0.001 * 1.25 ** i, 6) for i in range(54))
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= target:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (target - cumulative) / n, self.max)
+            cumulative += n
+        return self.max
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.sources = {}
+        self.labels = {}
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+    def percentile(self, stage, q):
+        with self.lock:
+            h = self.histograms.get(stage)
+            return h.percentile(q) if h is not None else None
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def attach(self, stage, histogram):
+        """Export a histogram owned elsewhere (e.g. updated lock-free by the
+        audio callback) under ``stage``."""
+        with self.lock:
+            self.histograms[stage] = histogram
+
+    def watch(self, name, read):
+        """Export a counter kept elsewhere; ``read()`` is called per snapshot."""
+        with self.lock:
+            self.sources[name] = read
+
+    def _counters(self):
+        return dict(self.counters, **{name: read() for name, read in self.sources.items()})
+
+    def snapshot(self):
+        with self.lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    "p50": h.percentile(0.5),
+                    "p95": h.percentile(0.95),
+                    "p99": h.percentile(0.99),
+                    "buckets": list(h.counts),
+                }
+                for stage, h in self.histograms.items()
+            }
+            return {"stages": stages, "counters": self._counters(), "labels": dict(self.labels)}
+
+    def prometheus(self):
+        lines = [
+            "# HELP whisperdrop_stage_seconds Duration of each dictation stage",
+            "# TYPE whisperdrop_stage_seconds histogram",
+        ]
+        with self.lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(h.bounds, h.counts):
+                    cumulative += n
+                    lines.append(f'whisperdrop_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'whisperdrop_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'whisperdrop_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'whisperdrop_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            for name, value in sorted(self._counters().items()):
+                lines.append(f"# TYPE whisperdrop_{name}_total counter")
+                lines.append(f"whisperdrop_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        record = dict(self.snapshot(), time=time.time(), host=socket.gethostname(),
+                      bounds=list(BUCKETS))
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+METRICS = Metrics()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body, content_type = METRICS.prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path.split("?")[0] == "/metrics.json":
+            body, content_type = json.dumps(METRICS.snapshot()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+    return server
+
+
+def dump_periodically(path, interval_s=60):
+    def run():
+        while True:
+            time.sleep(interval_s)
+            try:
+                METRICS.dump(path)
+            except OSError as e:
+                print(f"Metrics dump failed: {e}")
+    threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def model_memory_mb(model, rss_before):
+    # An InferenceProcess lives in its own process; in-process models are
+    # measured by how much they grew ours
+    if hasattr(model, "memory_mb"):
+        return model.memory_mb()
+    return max(rss_mb() - rss_before, 0)
+
+
+class CachedModel:
+    def __init__(self, model, device, memory_mb):
+        self.model = model
+        self.device = device
+        self.memory_mb = memory_mb
+        self.last_used = time.monotonic()
+
+    @property
+    def loaded(self):
+        if hasattr(self.model, "is_loaded"):
+            return self.model.is_loaded()
+        return self.model.model.model_is_loaded
+
+    def unload(self):
+        if hasattr(self.model, "unload"):
+            self.model.unload()
+        else:
+            self.model.model.unload_model()
+
+    def reload(self):
+        if hasattr(self.model, "reload"):
+            self.model.reload()
+        else:
+            self.model.model.load_model()
+
+
+class ModelCache:
+    """Loaded WhisperModels by name, least recently used first.
+
+    When the resident models' measured RAM exceeds ``budget_mb``, or one
+    has not been used for ``idle_s`` seconds, it is parked: CTranslate2
+    frees the weights but keeps the runtime context, so ``get`` brings it
+    back much faster than a fresh load (an ``InferenceProcess`` is stopped
+    and restarted instead). ``loader(name)`` returns ``(model, device)``,
+    as ``load_whisper_model`` does.
+    """
+
+    def __init__(self, loader, budget_mb=4000, idle_s=600):
+        self.loader = loader
+        self.budget_mb = budget_mb
+        self.idle_s = idle_s
+        self.entries = OrderedDict()
+        self.pinned = set()
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def parked(self, name):
+        entry = self.entries.get(name)
+        return entry is not None and not entry.loaded
+
+    def pin(self, name):
+        """Never park ``name`` (e.g. it is shared with the local API)."""
+        self.pinned.add(name)
+
+    def get(self, name):
+        """Return ``(model, device, seconds)``, loading or unparking as needed."""
+        with self.lock:
+            start = time.perf_counter()
+            entry = self.entries.get(name)
+            if entry is None:
+                before = rss_mb()
+                model, device = self.loader(name)
+                entry = self.entries[name] = CachedModel(model, device, model_memory_mb(model, before))
+                print(f"📦 Loaded {name} ({entry.memory_mb:.0f} MB) in {time.perf_counter() - start:.2f}s")
+            elif not entry.loaded:
+                before = rss_mb()
+                entry.reload()
+                entry.memory_mb = model_memory_mb(entry.model, before) or entry.memory_mb
+                print(f"♻️ Reloaded {name} in {time.perf_counter() - start:.2f}s")
+            self.entries.move_to_end(name)
+            entry.last_used = time.monotonic()
+            self._enforce_budget()
+            return entry.model, entry.device, time.perf_counter() - start
+
+    def resident(self):
+        """``(name, memory_mb)`` of every loaded model, most recently used last."""
+        return [(name, e.memory_mb) for name, e in self.entries.items() if e.loaded]
+
+    def unload_idle(self):
+        if not self.idle_s:
+            return
+        with self.lock:
+            now = time.monotonic()
+            for name, entry in self.entries.items():
+                if entry.loaded and now - entry.last_used > self.idle_s:
+                    self._park(name, "idle")
+
+    def close(self):
+        """Stop every model that runs in a child process."""
+        for entry in self.entries.values():
+            if hasattr(entry.model, "close"):
+                entry.model.close()
+
+    def _enforce_budget(self):
+        # The most recently used model always stays
+        for name in list(self.entries)[:-1]:
+            if sum(mb for _, mb in self.resident()) <= self.budget_mb:
+                break
+            if self.entries[name].loaded:
+                self._park(name, "over RAM budget")
+
+    def _park(self, name, reason):
+        if name in self.pinned:
+            return
+        self.entries[name].unload()
+        print(f"💤 Unloaded {name} ({reason})")
@@ -0,0 +1,210 @@
+"""Headless daemon that keeps one Whisper model loaded for every WhisperDrop.
+
+Run ``python model_server.py`` once per user; with ``model_server`` enabled
+``app.py`` connects to the Unix domain socket if it exists and loads the
+model in-process otherwise. The socket lives in ``$XDG_RUNTIME_DIR`` (or a
+private ``/tmp/whisperdrop-<uid>`` directory), and the client only talks to
+a daemon run by its own user, or by one listed in ``trusted_uids`` for a
+deliberately shared (``--shared``) daemon. Whatever the daemon returns is
+typed into the focused window, so an impostor must not be believed.
+
+Wire format, both directions: a 4-byte big-endian header length, a JSON
+header, then ``header["nbytes"]`` bytes of payload (float32 PCM at 16 kHz
+for transcription requests).
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+from config import load_config
+
+Segment = namedtuple("Segment", "start end text words")
+Word = namedtuple("Word", "start end word probability")
+Info = namedtuple("Info", "language duration")
+
+
+def default_socket_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "whisperdrop.sock")
+    directory = os.path.join(tempfile.gettempdir(), f"whisperdrop-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # Someone else may have created it first to control what is inside
+    info = os.lstat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not private to this user")
+    return os.path.join(directory, "whisperdrop.sock")
+
+
+def peer_uid(sock):
+    """uid of the process on the other end of a Unix socket (Linux)."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    pos = 0
+    while pos < n:
+        got = sock.recv_into(view[pos:], n - pos)
+        if not got:
+            raise ConnectionError("Connection closed")
+        pos += got
+    return buf
+
+
+def send_message(sock, header, payload=b""):
+    payload = memoryview(payload).cast("B")
+    data = json.dumps(dict(header, nbytes=payload.nbytes)).encode()
+    sock.sendall(struct.pack("!I", len(data)) + data)
+    if payload.nbytes:
+        sock.sendall(payload)
+
+
+def recv_message(sock):
+    (length,) = struct.unpack("!I", recv_exact(sock, 4))
+    header = json.loads(recv_exact(sock, length))
+    return header, recv_exact(sock, header.get("nbytes", 0))
+
+
+def segment_to_dict(segment):
+    words = None
+    if segment.words is not None:
+        words = [[w.start, w.end, w.word, w.probability] for w in segment.words]
+    return {"start": segment.start, "end": segment.end, "text": segment.text, "words": words}
+
+
+def segment_from_dict(s):
+    words = [Word(*w) for w in s["words"]] if s["words"] is not None else None
+    return Segment(s["start"], s["end"], s["text"], words)
+
+
+class ModelClient:
+    """Stand-in for WhisperModel that forwards ``transcribe`` to the daemon.
+
+    Refuses (``PermissionError``) a socket owned by, or a daemon running
+    as, anyone but this user and ``trusted_uids``.
+    """
+
+    def __init__(self, path=None, timeout=None, trusted_uids=()):
+        self.path = path
+        self.timeout = timeout
+        self.trusted_uids = {os.getuid(), *trusted_uids}
+
+    def _check(self, sock, path):
+        owner = os.lstat(path).st_uid
+        uid = peer_uid(sock)
+        for label, value in (("socket owner", owner), ("daemon", uid)):
+            if value is not None and value not in self.trusted_uids:
+                raise PermissionError(f"{path}: {label} uid {value} is not trusted")
+
+    def _request(self, header, payload=b""):
+        path = self.path or default_socket_path()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(path)
+            self._check(sock, path)
+            send_message(sock, header, payload)
+            return recv_message(sock)
+
+    def ping(self):
+        try:
+            return self._request({"op": "ping"})[0]
+        except PermissionError as e:
+            print(f"⚠️ Ignoring model server: {e}")
+            return None
+        except OSError:
+            return None
+
+    def transcribe(self, audio, **options):
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        header, _ = self._request({"op": "transcribe", "options": options}, audio)
+        if "error" in header:
+            raise RuntimeError(header["error"])
+        return [segment_from_dict(s) for s in header["segments"]], Info(**header["info"])
+
+
+class TranscriptionHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, payload = recv_message(self.request)
+        except (ConnectionError, ValueError):
+            return
+
+        server = self.server
+        if header.get("op") == "ping":
+            send_message(self.request, {"model": server.model_name, "device": server.device_used})
+            return
+
+        try:
+            audio = np.frombuffer(payload, dtype=np.float32)
+            segments, info = server.model.transcribe(audio, **header.get("options", {}))
+            send_message(self.request, {
+                "segments": [segment_to_dict(s) for s in segments],
+                "info": {"language": info.language, "duration": info.duration},
+            })
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            send_message(self.request, {"error": str(e)})
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, model, model_name, device_used):
+        self.model = model
+        self.model_name = model_name
+        self.device_used = device_used
+        super().__init__(path, TranscriptionHandler)
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Serve a shared Whisper model over a Unix socket")
+    parser.add_argument("--model", default=config["model_name"])
+    parser.add_argument("--socket", default=config["model_server_socket"] or default_socket_path())
+    parser.add_argument("--workers", type=int, default=2,
+                        help="concurrent transcriptions (CTranslate2 num_workers)")
+    parser.add_argument("--shared", action="store_true",
+                        help="let other local users connect to the socket")
+    parser.add_argument("--cpu", action="store_true")
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        if ModelClient(args.socket, timeout=1).ping() is not None:
+            print(f"A model server is already listening on {args.socket}")
+            sys.exit(1)
+        os.unlink(args.socket)
+
+    from models import load_whisper_model
+
+    print(f"Loading model: {args.model}")
+    model, device_used = load_whisper_model(
+        args.model, force_device="cpu" if args.cpu else None, num_workers=args.workers
+    )
+
+    server = ModelServer(args.socket, model, args.model, device_used)
+    os.chmod(args.socket, 0o666 if args.shared else 0o600)
+    print(f"✅ Serving {args.model} ({device_used}) on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
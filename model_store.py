@@ -0,0 +1,274 @@
+"""Pre-quantized int8 models on disk, loaded offline.
+
+The hub checkpoints are float16, so ``compute_type="int8"`` on CPU makes
+CTranslate2 read the float16 weights and quantize them in memory on every
+launch, which costs time and a transient RSS spike. ``convert`` does that
+once from the original Transformers checkpoint and stores the int8
+CTranslate2 model under ``~/.cache/whisperdrop/models``;
+``load_whisper_model`` then loads it straight from that directory with no
+network access.
+
+Each entry's directory name carries a key of the source model, its hub
+revision, the quantization and the CTranslate2 version that wrote it, and
+its ``manifest.json`` lists the size and SHA-256 of every file. Files are
+re-hashed whenever their mtime no longer matches the manifest, and an entry
+that fails the check is ignored. Conversion needs ``transformers`` (only
+for this step):
+
+    uv run --with transformers python model_store.py convert small medium
+    uv run python model_store.py list
+    uv run python model_store.py bench small
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisperdrop", "models")
+QUANTIZATION = "int8"
+COPY_FILES = ["tokenizer.json", "preprocessor_config.json"]
+
+# Transformers checkpoints behind faster-whisper's model names
+SOURCES = {
+    "large": "openai/whisper-large-v3",
+    "turbo": "openai/whisper-large-v3-turbo",
+    "large-v3-turbo": "openai/whisper-large-v3-turbo",
+    "distil-large-v2": "distil-whisper/distil-large-v2",
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+    "distil-medium.en": "distil-whisper/distil-medium.en",
+    "distil-small.en": "distil-whisper/distil-small.en",
+}
+
+
+def source_model(model_name):
+    if "/" in model_name:
+        return model_name
+    return SOURCES.get(model_name, f"openai/whisper-{model_name}")
+
+
+def ctranslate2_version():
+    try:
+        from importlib.metadata import version
+        return version("ctranslate2")
+    except Exception:
+        return "unknown"
+
+
+def entry_key(source, revision, quantization):
+    key = f"{source}@{revision}|{quantization}|ct2-{ctranslate2_version()}"
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def entry_prefix(model_name, quantization):
+    return f"{model_name.replace('/', '--')}-{quantization}-"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_manifest(path, manifest):
+    temporary = os.path.join(path, "manifest.json.tmp")
+    with open(temporary, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, os.path.join(path, "manifest.json"))
+
+
+def verify(path):
+    """Return the entry's manifest if every file is intact, else None.
+
+    Sizes are always checked; contents are re-hashed only for files whose
+    mtime changed since they were last verified, so a normal start costs
+    a few ``stat`` calls.
+    """
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    changed = False
+    for name, expected in manifest["files"].items():
+        try:
+            stat = os.stat(os.path.join(path, name))
+        except OSError:
+            return None
+        if stat.st_size != expected["size"]:
+            return None
+        if stat.st_mtime_ns != expected.get("mtime_ns"):
+            if file_digest(os.path.join(path, name)) != expected["sha256"]:
+                return None
+            expected["mtime_ns"] = stat.st_mtime_ns
+            changed = True
+    if changed:
+        try:
+            write_manifest(path, manifest)
+        except OSError:
+            pass
+    return manifest
+
+
+def entries(model_name=None, quantization=QUANTIZATION, store_dir=STORE_DIR):
+    """``(path, manifest)`` of every stored entry, newest first."""
+    try:
+        names = os.listdir(store_dir)
+    except OSError:
+        return []
+    found = []
+    for name in names:
+        if model_name is not None and not name.startswith(entry_prefix(model_name, quantization)):
+            continue
+        try:
+            with open(os.path.join(store_dir, name, "manifest.json")) as f:
+                found.append((os.path.join(store_dir, name), json.load(f)))
+        except (OSError, ValueError):
+            continue
+    return sorted(found, key=lambda entry: entry[1]["created"], reverse=True)
+
+
+def find(model_name, quantization=QUANTIZATION, store_dir=STORE_DIR):
+    """Path of the newest intact entry for ``model_name`` written by this
+    CTranslate2 major version, or None."""
+    major = ctranslate2_version().split(".")[0]
+    for path, manifest in entries(model_name, quantization, store_dir):
+        if manifest["ctranslate2"].split(".")[0] != major:
+            continue
+        if verify(path) is None:
+            print(f"⚠️ {path} failed its integrity check, ignoring it")
+            continue
+        return path
+    return None
+
+
+def convert(model_name, quantization=QUANTIZATION, store_dir=STORE_DIR, source=None):
+    """Convert ``model_name`` once and store it; returns the entry path."""
+    try:
+        from ctranslate2.converters import TransformersConverter
+    except ImportError as e:
+        sys.exit(f"Conversion needs transformers ({e}); run with `uv run --with transformers ...`")
+
+    source = source or source_model(model_name)
+    revision = "local"
+    if not os.path.isdir(source):
+        from huggingface_hub import HfApi
+        revision = HfApi().model_info(source).sha
+
+    key = entry_key(source, revision, quantization)
+    path = os.path.join(store_dir, entry_prefix(model_name, quantization) + key)
+    if verify(path) is not None:
+        print(f"{model_name}: already stored in {path}")
+        return path
+
+    os.makedirs(store_dir, exist_ok=True)
+    # Convert next to the final location and rename, so a crash never
+    # leaves a half-written entry behind
+    staging = tempfile.mkdtemp(prefix=".converting-", dir=store_dir)
+    try:
+        start = time.perf_counter()
+        converter = TransformersConverter(
+            source, copy_files=COPY_FILES, revision=None if revision == "local" else revision,
+            low_cpu_mem_usage=True,
+        )
+        converter.convert(staging, quantization=quantization, force=True)
+        files = {}
+        for name in sorted(os.listdir(staging)):
+            file = os.path.join(staging, name)
+            files[name] = {"size": os.path.getsize(file), "sha256": file_digest(file),
+                           "mtime_ns": os.stat(file).st_mtime_ns}
+        write_manifest(staging, {
+            "model": model_name,
+            "source": source,
+            "revision": revision,
+            "quantization": quantization,
+            "ctranslate2": ctranslate2_version(),
+            "created": time.time(),
+            "files": files,
+        })
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(staging, path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    size = sum(f["size"] for f in files.values()) / 2**20
+    print(f"{model_name}: {source}@{revision[:8]} -> {quantization} ({size:.0f} MB) "
+          f"in {time.perf_counter() - start:.1f}s, stored in {path}")
+    return path
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        # ru_maxrss is in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+
+def measure_load(model, compute_type, conn):
+    from faster_whisper import WhisperModel
+
+    from model_cache import rss_mb
+    before = rss_mb()
+    start = time.perf_counter()
+    WhisperModel(model, device="cpu", compute_type=compute_type, local_files_only=True)
+    conn.send((time.perf_counter() - start, peak_rss_mb() - before, rss_mb() - before))
+
+
+def bench(model_name, repeat=3, store_dir=STORE_DIR):
+    """Load from the hub cache and from the store, each in a fresh process."""
+    import multiprocessing
+
+    stored = find(model_name, store_dir=store_dir)
+    if stored is None:
+        sys.exit(f"No stored {QUANTIZATION} entry for {model_name}; "
+                 f"run `model_store.py convert {model_name}` first")
+    context = multiprocessing.get_context("spawn")
+    print(f"{'load path':<30}{'load s':>8}{'peak MB':>9}{'steady MB':>11}")
+    for label, model in ((f"hub float16 -> {QUANTIZATION}", model_name), (f"stored {QUANTIZATION}", stored)):
+        runs = []
+        for _ in range(repeat):
+            parent, child = context.Pipe()
+            process = context.Process(target=measure_load, args=(model, QUANTIZATION, child))
+            process.start()
+            runs.append(parent.recv())
+            process.join()
+        seconds, peak, steady = (statistics.median(values) for values in zip(*runs))
+        print(f"{label:<30}{seconds:>8.2f}{peak:>9.0f}{steady:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-quantized int8 model store")
+    parser.add_argument("--dir", default=STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("convert", help="convert models to int8 once and store them")
+    add.add_argument("models", nargs="+")
+    add.add_argument("--source", help="Transformers model ID or local directory to convert from")
+    commands.add_parser("list", help="show stored entries and whether they are intact")
+    timing = commands.add_parser("bench", help="compare load time and peak RSS against the hub model")
+    timing.add_argument("model")
+    timing.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for model_name in args.models:
+            convert(model_name, store_dir=args.dir, source=args.source)
+    elif args.command == "list":
+        for path, manifest in entries(store_dir=args.dir):
+            status = "ok" if verify(path) is not None else "CORRUPT"
+            size = sum(f["size"] for f in manifest["files"].values()) / 2**20
+            print(f"{manifest['model']:<16}{manifest['quantization']:<6}{manifest['revision'][:8]:<10}"
+                  f"ct2 {manifest['ctranslate2']:<8}{size:>7.0f} MB  {status:<8}{path}")
+    else:
+        bench(args.model, args.repeat, args.dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from faster_whisper import WhisperModel
+
+from autotune import load_tuning
+from model_store import find as find_stored_model
+
+
+def load_whisper_model(model_name, force_device=None, **kwargs):
+    """Load a WhisperModel on CUDA (float16), falling back to CPU.
+
+    On CPU the compute type and thread count calibrated by ``autotune.py``
+    are used when this machine has been calibrated, int8 otherwise. int8
+    models converted with ``model_store.py`` are loaded from disk as is.
+    Returns the model and the device label shown in the status area.
+    """
+    if force_device != "cpu":
+        try:
+            return WhisperModel(model_name, device="cuda", compute_type="float16", **kwargs), "CUDA"
+        except Exception as e:
+            print(f"CUDA unavailable ({e}), using CPU")
+
+    compute_type = "int8"
+    tuning = load_tuning(model_name)
+    if tuning is not None:
+        compute_type = tuning["compute_type"]
+        kwargs.setdefault("cpu_threads", tuning["cpu_threads"])
+        print(f"Using calibrated CPU settings: {compute_type}, {tuning['cpu_threads']} threads")
+    if compute_type.startswith("int8"):
+        # Already quantized on disk: no float16 read, no network
+        stored = find_stored_model(model_name)
+        if stored is not None:
+            print(f"Loading pre-quantized {model_name} from {stored}")
+            return WhisperModel(stored, device="cpu", compute_type=compute_type, **kwargs), "CPU"
+    return WhisperModel(model_name, device="cpu", compute_type=compute_type, **kwargs), "CPU"
@@ -0,0 +1,184 @@
+"""Parallel decoding of long recordings across CPU cores.
+
+A single ``transcribe`` call decodes one 30 s window after another on one
+CTranslate2 replica. ``ParallelDecoder`` instead splits the recording at
+VAD silence into chunks of at most ``chunk_s`` and decodes them
+concurrently on a model with ``workers`` replicas of ``cores // workers``
+threads each, yielding the text back in order.
+
+Benchmark it against the app's current path on a long recording:
+
+    uv run python parallel_decode.py meeting.wav --workers 1 2 4 8
+"""
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from longform import iter_windows
+from streaming import normalize_word
+
+SAMPLERATE = 16000
+# ModelCache name suffix for a model's parallel decoder
+PARALLEL = "@parallel"
+
+
+def plan_chunks(buffer, samplerate=16000, chunk_s=30.0, overlap_s=1.0, scan_s=300):
+    """Return ``(start, end, overlaps)`` sample ranges covering the speech.
+
+    Speech regions are grouped up to ``chunk_s`` and cut at the pauses
+    between them. Speech that runs longer than ``chunk_s`` without a pause
+    has to be cut hard; the next chunk then starts ``overlap_s`` early
+    (``overlaps`` is True) so the word at the cut is decoded whole. VAD
+    runs ``scan_s`` at a time so spilled recordings are never fully loaded.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    # Leave room for the speech padding VAD adds around each region
+    vad_options = VadOptions(min_silence_duration_ms=300, max_speech_duration_s=chunk_s - 1)
+    limit = int(chunk_s * samplerate)
+    overlap = int(overlap_s * samplerate)
+    min_gap = samplerate // 10
+
+    chunks = []
+    for window_start, window_end in iter_windows(buffer, samplerate, scan_s):
+        speech = get_speech_timestamps(buffer.view(window_start, window_end), vad_options)
+        for region in speech:
+            start, end = window_start + region["start"], window_start + region["end"]
+            if chunks and end - chunks[-1][0] <= limit:
+                chunks[-1] = (chunks[-1][0], end, chunks[-1][2])
+            elif chunks and start - chunks[-1][1] < min_gap:
+                chunks.append((max(start - overlap, chunks[-1][0]), end, True))
+            else:
+                chunks.append((start, end, False))
+    return chunks
+
+
+def drop_repeated_words(previous, pieces, max_n=8):
+    """Drop the leading words of ``pieces`` that repeat the end of ``previous``."""
+    words = " ".join(pieces).split()
+    for n in range(min(max_n, len(previous), len(words)), 0, -1):
+        if [normalize_word(w) for w in previous[-n:]] == [normalize_word(w) for w in words[:n]]:
+            break
+    else:
+        return pieces
+
+    result = []
+    for piece in pieces:
+        piece_words = piece.split()
+        if n >= len(piece_words):
+            n -= len(piece_words)
+            continue
+        result.append(" ".join(piece_words[n:]))
+        n = 0
+    return result
+
+
+def decode_chunk(model, buffer, start, end, options):
+    # Read the chunk only once a worker runs it: a spilled recording's
+    # view is a copy, so reading ahead would load the whole file
+    segments, _ = model.transcribe(buffer.view(start, end), **options)
+    return [text for text in (s.text.strip() for s in segments) if text]
+
+
+class ParallelDecoder:
+    """A model with ``workers`` CTranslate2 replicas and a matching thread pool."""
+
+    def __init__(self, model_name, workers=0, force_device=None):
+        from models import load_whisper_model
+        from transcribe_files import default_workers
+
+        default, cores = default_workers()
+        self.model_name = model_name
+        self.workers = workers or max(default, 2)
+        self.cpu_threads = max(1, cores // self.workers)
+        self.model, self.device = load_whisper_model(
+            model_name, force_device, cpu_threads=self.cpu_threads, num_workers=self.workers
+        )
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    # Parking hooks for ModelCache, as on InferenceProcess
+    def is_loaded(self):
+        return self.model.model.model_is_loaded
+
+    def unload(self):
+        self.model.model.unload_model()
+
+    def reload(self):
+        self.model.model.load_model()
+
+    def transcribe(self, buffer, samplerate=16000, chunk_s=30.0, overlap_s=1.0, **options):
+        """Yield text pieces of the whole recording, in order."""
+        # Chunks are already cut to speech, and decode independently
+        options = dict(options, vad_filter=False, condition_on_previous_text=False)
+        options.pop("vad_parameters", None)
+        options.pop("initial_prompt", None)
+
+        chunks = iter(plan_chunks(buffer, samplerate, chunk_s, overlap_s))
+
+        def submit(chunk):
+            start, end, overlaps = chunk
+            return overlaps, self.pool.submit(decode_chunk, self.model, buffer, start, end, options)
+
+        # Enough queued to keep every worker busy, but only a bounded window
+        # of the recording is in flight at once
+        pending = deque(map(submit, islice(chunks, 2 * self.workers)))
+        previous = []
+        while pending:
+            overlaps, future = pending.popleft()
+            pending.extend(map(submit, islice(chunks, 1)))
+            pieces = future.result()
+            if overlaps:
+                pieces = drop_repeated_words(previous, pieces)
+            for text in pieces:
+                previous = (previous + text.split())[-8:]
+                yield text
+
+
+def main():
+    from audio_buffer import AudioBuffer
+    from audio_files import load_audio
+    from config import load_config
+    from models import load_whisper_model
+    from pipeline import transcribe_recording
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Benchmark parallel chunked decoding against a single call")
+    parser.add_argument("clip", help="a long recording (minutes, not seconds)")
+    parser.add_argument("--model", default=config["model_name"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-s", type=float, default=30.0)
+    parser.add_argument("--cpu", action="store_true")
+    args = parser.parse_args()
+
+    audio = load_audio(args.clip, SAMPLERATE)
+    buffer = AudioBuffer(SAMPLERATE, len(audio) / SAMPLERATE + 1)
+    buffer.append(audio)
+    duration = buffer.duration()
+    force_device = "cpu" if args.cpu else None
+    options = dict(beam_size=config["beam_size"], language=config["language"],
+                   vad_filter=True, vad_parameters=dict(min_silence_duration_ms=300))
+
+    print(f"{args.model} on a {duration / 60:.1f} min recording\n")
+    print(f"{'path':<22}{'decode s':>10}{'RTF':>8}{'speedup':>9}{'chars':>8}")
+
+    model, _ = load_whisper_model(args.model, force_device)
+    start = time.perf_counter()
+    text = " ".join(transcribe_recording(model, buffer, options, SAMPLERATE, config["long_window_s"]))
+    baseline = time.perf_counter() - start
+    print(f"{'single call':<22}{baseline:>10.2f}{baseline / duration:>8.3f}{1:>8.2f}x{len(text):>8}")
+    del model
+
+    for workers in args.workers:
+        decoder = ParallelDecoder(args.model, workers, force_device)
+        start = time.perf_counter()
+        text = " ".join(decoder.transcribe(buffer, SAMPLERATE, args.chunk_s, **options))
+        elapsed = time.perf_counter() - start
+        label = f"{workers} x {decoder.cpu_threads} threads"
+        print(f"{label:<22}{elapsed:>10.2f}{elapsed / duration:>8.3f}{baseline / elapsed:>8.2f}x{len(text):>8}")
+        decoder.pool.shutdown()
+        del decoder
+
+
+if __name__ == "__main__":
+    main()
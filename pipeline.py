@@ -0,0 +1,34 @@
+from longform import transcribe_windows
+
+
+def transcribe_recording(model, audio_buffer, transcribe_options, samplerate=16000,
+                         long_window_s=120, streamer=None, parallel=None):
+    """Yield the transcript of a finished recording piece by piece, in order.
+
+    Shared by the app and the headless benchmark so both measure the same
+    path: streaming tail decode, parallel chunked decode (``parallel`` is a
+    ``ParallelDecoder``), windowed long-form decode, or a single
+    ``transcribe`` call over the whole buffer.
+    """
+    if streamer is not None:
+        offset = streamer.offset
+        text = streamer.finish(audio_buffer.view(offset), offset)
+        if text:
+            yield text
+        return
+
+    if parallel is not None:
+        yield from parallel.transcribe(audio_buffer, samplerate, **transcribe_options)
+        return
+
+    if audio_buffer.duration() > long_window_s:
+        segments = transcribe_windows(
+            model, audio_buffer, samplerate, long_window_s, **transcribe_options
+        )
+    else:
+        segments, _ = model.transcribe(audio_buffer.view(), **transcribe_options)
+
+    for segment in segments:
+        text = segment.text.strip()
+        if text:
+            yield text
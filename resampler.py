@@ -0,0 +1,101 @@
+"""Streaming polyphase resampling of capture blocks to 16 kHz.
+
+Opening the microphone at 16 kHz makes many USB headsets and PipeWire
+setups fail or resample in the audio server. ``AudioCapture`` can instead
+open the device at its native rate and pass each block through
+``StreamingResampler``. The resampler keeps its filter history between
+blocks, so the output is identical to resampling the whole recording at
+once. Benchmark its cost per second of audio:
+
+    uv run python resampler.py [--rates 48000 44100] [--blocksize 512]
+"""
+import argparse
+import time
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def design_filter(up, down, zeros=16, rolloff=0.9, beta=8.6):
+    """Kaiser-windowed sinc low-pass at the upsampled rate, split into
+    ``up`` phases (rows), each reversed for direct dot products."""
+    cutoff = rolloff * 0.5 / max(up, down)
+    half = zeros * int(np.ceil(0.5 / cutoff))
+    n = np.arange(-half, half + 1)
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta) * up
+    taps = -(-len(h) // up)
+    h = np.concatenate([h, np.zeros(taps * up - len(h))])
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32), half
+
+
+class StreamingResampler:
+    """Rational-ratio resampler for a stream of float32 blocks."""
+
+    def __init__(self, rate_in, rate_out=16000, zeros=16):
+        divisor = gcd(int(rate_in), int(rate_out))
+        self.up = int(rate_out) // divisor
+        self.down = int(rate_in) // divisor
+        self.phases, delay = design_filter(self.up, self.down, zeros)
+        self.taps = self.phases.shape[1]
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Start at the filter's group delay so output lines up with the input
+        self.position = delay
+
+    def process(self, block):
+        if self.up == self.down:
+            return block
+        x = np.concatenate([self.history, block])
+        limit = len(block) * self.up
+        count = max(0, -(-(limit - self.position) // self.down))
+        positions = self.position + self.down * np.arange(count)
+        windows = sliding_window_view(x, self.taps)[positions // self.up]
+        out = np.einsum("nk,nk->n", windows, self.phases[positions % self.up])
+
+        self.position += count * self.down - limit
+        self.history = x[len(x) - (self.taps - 1):]
+        return out.astype(np.float32, copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture resampling to 16 kHz")
+    parser.add_argument("--rates", type=int, nargs="+", default=[48000, 44100, 32000])
+    parser.add_argument("--blocksize", type=int, default=512, help="device block size in frames")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    import librosa
+    from scipy.signal import resample_poly
+
+    print(f"{'rate':>7}{'taps':>6}{'stream us/s':>13}{'per block us':>14}{'librosa us/s':>14}"
+          f"{'poly us/s':>11}{'SNR dB':>8}")
+    librosa.resample(np.zeros(4800, dtype=np.float32), orig_sr=48000, target_sr=16000)  # warm-up
+    for rate in args.rates:
+        audio = np.sin(2 * np.pi * 440 * np.arange(int(args.seconds * rate)) / rate).astype(np.float32)
+        blocks = [audio[i:i + args.blocksize] for i in range(0, len(audio), args.blocksize)]
+
+        resampler = StreamingResampler(rate)
+        start = time.perf_counter()
+        streamed = np.concatenate([resampler.process(b) for b in blocks])
+        stream_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        librosa.resample(audio, orig_sr=rate, target_sr=16000)
+        librosa_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resample_poly(audio, resampler.up, resampler.down)
+        poly_s = time.perf_counter() - start
+
+        # Accuracy against the ideal 16 kHz sine, away from the edges
+        ideal = np.sin(2 * np.pi * 440 * np.arange(len(streamed)) / 16000)
+        error = (streamed - ideal)[200:-200]
+        snr = 10 * np.log10(np.sum(ideal[200:-200] ** 2) / max(np.sum(error ** 2), 1e-20))
+        per_second = 1e6 / args.seconds
+        print(f"{rate:>7}{resampler.taps:>6}{stream_s * per_second:>13.0f}"
+              f"{stream_s / len(blocks) * 1e6:>14.1f}{librosa_s * per_second:>14.0f}"
+              f"{poly_s * per_second:>11.0f}{snr:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import re
+import threading
+
+
+def normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    """Incremental transcription of a growing recording.
+
+    Every pass decodes the audio after ``offset`` and commits the words the
+    pass agrees on with the previous one (LocalAgreement-2). Committed words
+    are never decoded again once the window is trimmed, so ``finish`` only
+    has to decode the uncommitted tail.
+
+    Callers pass only the audio from ``offset`` on, with ``start`` giving
+    its position in the recording, so a spilled recording is never read
+    back whole. If ``max_window`` seconds pile up without a commit (long
+    silence, or speech that never settles), the window is cut to the last
+    ``window`` seconds anyway and hypothesis words before the cut are
+    committed as they stand.
+    """
+
+    def __init__(self, model, samplerate=16000, window=15.0, max_window=120.0, **transcribe_options):
+        self.model = model
+        self.samplerate = samplerate
+        self.window = window
+        self.max_window = max_window
+        self.transcribe_options = transcribe_options
+        self.committed = []
+        self.hypothesis = []
+        self.offset = 0
+        self.processed = 0
+        self.lock = threading.Lock()
+
+    def text(self):
+        return "".join(word for _, _, word in self.committed).strip()
+
+    def _committed_end(self):
+        return self.committed[-1][1] if self.committed else 0.0
+
+    def _decode(self, audio, start):
+        base = self.offset / self.samplerate
+        prompt = self.text()[-200:]
+        segments, _ = self.model.transcribe(
+            audio[self.offset - start:],
+            initial_prompt=prompt or None,
+            condition_on_previous_text=False,
+            word_timestamps=True,
+            **self.transcribe_options,
+        )
+
+        last_end = self._committed_end()
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                start = base + word.start
+                if start >= last_end - 0.1:
+                    words.append((start, base + word.end, word.word))
+
+        # Drop words the previous window already committed (1- to 5-gram overlap)
+        if self.committed and words:
+            for n in range(min(5, len(self.committed), len(words)), 0, -1):
+                tail = [normalize_word(w) for _, _, w in self.committed[-n:]]
+                head = [normalize_word(w) for _, _, w in words[:n]]
+                if tail == head:
+                    words = words[n:]
+                    break
+        return words
+
+    def process(self, audio, start=0):
+        """Decode the current window and commit the agreed prefix.
+
+        ``audio`` holds the recording from sample ``start`` (at most
+        ``offset``) to its current end.
+        """
+        with self.lock:
+            end = start + len(audio)
+            self.processed = end
+            words = self._decode(audio, start)
+
+            agreed = 0
+            for new, old in zip(words, self.hypothesis):
+                if normalize_word(new[2]) != normalize_word(old[2]):
+                    break
+                agreed += 1
+            self.committed.extend(words[:agreed])
+            self.hypothesis = words[agreed:]
+
+            if self.committed and (end - self.offset) / self.samplerate > self.window:
+                self.offset = max(self.offset, int(self._committed_end() * self.samplerate))
+
+            if (end - self.offset) / self.samplerate > self.max_window:
+                cut = end - int(self.window * self.samplerate)
+                settled = [w for w in self.hypothesis if w[1] * self.samplerate <= cut]
+                self.committed.extend(settled)
+                self.hypothesis = self.hypothesis[len(settled):]
+                self.offset = max(self.offset, cut)
+
+            return self.text()
+
+    def finish(self, audio, start=0):
+        """Decode only the uncommitted tail and return the full transcript."""
+        with self.lock:
+            if self.committed:
+                self.offset = max(self.offset, int(self._committed_end() * self.samplerate))
+            if start + len(audio) > self.offset:
+                self.committed.extend(self._decode(audio, start))
+            self.hypothesis = []
+            return self.text()
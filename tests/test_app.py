@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from audio_buffer import SpillBuffer
+
+try:
+    import app
+except (Exception, SystemExit) as e:
+    # Needs the Linux desktop dependencies (customtkinter, pynput, X11)
+    app = None
+    reason = f"app.py unavailable: {e}"
+else:
+    reason = ""
+
+SAMPLERATE = 16000
+
+
+def spilled_recording(directory):
+    buffer = SpillBuffer(SAMPLERATE, spill_seconds=1, directory=directory)
+    buffer.append(np.zeros(2 * SAMPLERATE, dtype=np.float32))
+    buffer.view()
+    return buffer
+
+
+@unittest.skipIf(app is None, reason)
+class SpillCleanupTest(unittest.TestCase):
+    def make_app(self):
+        # Only the attributes the job path touches; no window is created
+        instance = app.SimpleApp.__new__(app.SimpleApp)
+        instance.model = None
+        instance.samplerate = SAMPLERATE
+        instance.after = lambda delay, *args: None
+        return instance
+
+    def test_no_model_removes_spill_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            buffer = spilled_recording(directory)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.make_app().process_audio(buffer)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_discarding_a_gated_recording_removes_spill_file(self):
+        from vad_gate import SpeechGate
+
+        with tempfile.TemporaryDirectory() as directory:
+            gate = SpeechGate(spilled_recording(directory), SAMPLERATE)
+            self.make_app().discard_recording(gate)
+            self.assertEqual(os.listdir(directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import unittest
+
+from inserter import TextInserter
+
+
+class ReplaceGuardTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = []
+        self.inserter = TextInserter(self.screen.append, lambda text: self.screen.append(("delete", text)))
+
+    def drain(self):
+        done = threading.Event()
+        self.inserter.when_done(lambda ok: done.set())
+        self.assertTrue(done.wait(5))
+
+    def test_insert_between_trigger_and_replace_keeps_text(self):
+        self.inserter.insert("first")
+        self.drain()
+        # F10 pressed: the re-transcription remembers where the sequence was
+        sequence = self.inserter.sequence
+        # A new dictation goes in before the re-transcription is ready
+        self.inserter.insert("second")
+        self.inserter.replace(["first"], "FIRST", lambda: self.inserter.sequence == sequence)
+        self.drain()
+        self.assertEqual(self.screen, ["first", "second"])
+
+    def test_replace_when_nothing_went_in_since(self):
+        self.inserter.insert("first")
+        self.drain()
+        sequence = self.inserter.sequence
+        self.inserter.replace(["first"], "FIRST", lambda: self.inserter.sequence == sequence)
+        self.drain()
+        self.assertEqual(self.screen, ["first", ("delete", "first"), "FIRST"])
+        self.assertEqual(self.inserter.sequence, sequence + 1)
+
+
+class InjectedKeysTest(unittest.TestCase):
+    def test_user_key_right_after_injection_is_not_claimed(self):
+        inserter = TextInserter(lambda text: None)
+        inserter.expect_keys(3)
+        self.assertEqual([inserter.injected_key() for _ in range(4)], [True, True, True, False])
+
+    def test_failed_insert_forgets_expected_keys(self):
+        def type_text(text):
+            inserter.expect_keys(len(text))
+            raise RuntimeError("no XTEST")
+
+        inserter = TextInserter(type_text)
+        inserter.insert("hello")
+        done = threading.Event()
+        inserter.when_done(lambda ok: done.set())
+        self.assertTrue(done.wait(5))
+        self.assertFalse(inserter.injected_key())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import time
+import tracemalloc
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+import parallel_decode
+from audio_buffer import SpillBuffer
+
+SAMPLERATE = 16000
+CHUNK_S = 30
+
+
+class FakeModel:
+    def transcribe(self, audio, **options):
+        # Slower than reading a chunk back, as a real decode is
+        time.sleep(0.05)
+        return [SimpleNamespace(text=f" chunk {int(audio[0])}")], None
+
+
+class SpilledRecordingTest(unittest.TestCase):
+    def test_peak_memory_stays_bounded(self):
+        workers = 4
+        chunks = 40
+        block = SAMPLERATE * CHUNK_S
+        with tempfile.TemporaryDirectory() as directory:
+            buffer = SpillBuffer(SAMPLERATE, spill_seconds=CHUNK_S, directory=directory)
+            for i in range(chunks):
+                buffer.append(np.full(block, i, dtype=np.float32))
+            plan = [(i * block, (i + 1) * block, False) for i in range(chunks)]
+
+            decoder = parallel_decode.ParallelDecoder.__new__(parallel_decode.ParallelDecoder)
+            decoder.workers = workers
+            decoder.model = FakeModel()
+            decoder.pool = ThreadPoolExecutor(max_workers=workers)
+            tracemalloc.start()
+            try:
+                with mock.patch.object(parallel_decode, "plan_chunks", return_value=plan):
+                    text = list(decoder.transcribe(buffer, SAMPLERATE, CHUNK_S))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+                decoder.pool.shutdown()
+                buffer.close()
+
+        self.assertEqual(text, [f"chunk {i}" for i in range(chunks)])
+        recording = chunks * block * 4
+        chunk = block * 4
+        # Only the chunks the workers are decoding are ever read back
+        self.assertLess(peak, (workers + 2) * chunk)
+        self.assertLess(peak, recording / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
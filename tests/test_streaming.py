@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from streaming import StreamingTranscriber
+
+SAMPLERATE = 16000
+
+
+class SilentModel:
+    def __init__(self):
+        self.decoded = []
+
+    def transcribe(self, audio, **options):
+        self.decoded.append(len(audio))
+        return [], None
+
+
+class WindowTest(unittest.TestCase):
+    def test_window_is_trimmed_without_commits(self):
+        model = SilentModel()
+        streamer = StreamingTranscriber(model, SAMPLERATE, window=15.0, max_window=60.0)
+        recording = np.zeros(300 * SAMPLERATE, dtype=np.float32)
+        for end in range(SAMPLERATE, len(recording) + 1, SAMPLERATE):
+            offset = streamer.offset
+            streamer.process(recording[offset:end], offset)
+        self.assertLessEqual(max(model.decoded), 60 * SAMPLERATE + SAMPLERATE)
+        self.assertEqual(streamer.finish(recording[streamer.offset:], streamer.offset), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
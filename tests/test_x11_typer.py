@@ -0,0 +1,68 @@
+import threading
+import unittest
+from unittest import mock
+
+from inserter import TextInserter
+
+try:
+    from x11_typer import XTestTyper
+except ImportError as e:
+    XTestTyper = None
+    reason = f"python-xlib unavailable: {e}"
+else:
+    reason = ""
+
+
+class FakeDisplay:
+    """A layout with only ASCII letters and no free keycode."""
+
+    def __init__(self):
+        self.pressed = []
+
+    def keysym_to_keycodes(self, keysym):
+        if chr(keysym).isascii() and chr(keysym).isalpha():
+            return [(keysym, 0)]
+        return []
+
+    def query_keymap(self):
+        return [0] * 32
+
+    def get_modifier_mapping(self):
+        return [[] for _ in range(8)]
+
+    def sync(self):
+        pass
+
+
+@unittest.skipIf(XTestTyper is None, reason)
+class UnmappedCharacterTest(unittest.TestCase):
+    def make_typer(self):
+        typer = XTestTyper.__new__(XTestTyper)
+        typer.display = FakeDisplay()
+        typer.keys = {}
+        typer.shift = typer.control = None
+        typer.spare = None
+        return typer
+
+    def test_unmapped_character_without_spare_keycode_raises(self):
+        typer = self.make_typer()
+        self.assertTrue(typer.can_type("abc"))
+        self.assertFalse(typer.can_type("café"))
+        with mock.patch("x11_typer.xtest"):
+            with self.assertRaises(RuntimeError):
+                typer.type("é")
+
+    def test_insert_is_reported_as_failed(self):
+        typer = self.make_typer()
+        inserter = TextInserter(typer.type)
+        results = []
+        done = threading.Event()
+        with mock.patch("x11_typer.xtest"):
+            inserter.insert("é")
+            inserter.when_done(lambda ok: (results.append(ok), done.set()))
+            self.assertTrue(done.wait(5))
+        self.assertEqual(results, [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Headless batch transcription of recorded audio files.
+
+Transcribes files and directories with the same model and settings as the
+widget, one JSON line per file on stdout (or --output) as soon as each
+finishes, and prints throughput in audio-hours per wall-clock hour:
+
+    uv run python transcribe_files.py notes/ --workers 4 > notes.jsonl
+
+On CPU the files are spread over a process pool, each worker owning a model
+with an equal share of the cores. ``--batched`` decodes each file with
+faster-whisper's batched pipeline instead (best on GPU).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SAMPLERATE = 16000
+
+_worker = {}
+
+
+def init_worker(model_name, force_device, cpu_threads, batched):
+    from models import load_whisper_model
+    model, device_used = load_whisper_model(model_name, force_device, cpu_threads=cpu_threads)
+    if batched:
+        from faster_whisper import BatchedInferencePipeline
+        model = BatchedInferencePipeline(model)
+    _worker.update(model=model, device=device_used, batched=batched)
+
+
+def transcribe_file(path, transcribe_options, batch_size):
+    from audio_files import load_audio
+    start = time.perf_counter()
+    try:
+        audio = load_audio(path, SAMPLERATE)
+        options = dict(transcribe_options)
+        if _worker["batched"]:
+            options["batch_size"] = batch_size
+        segments, _ = _worker["model"].transcribe(audio, **options)
+        segments = [{"start": s.start, "end": s.end, "text": s.text.strip()} for s in segments]
+        return {
+            "path": path,
+            "duration": len(audio) / SAMPLERATE,
+            "text": " ".join(s["text"] for s in segments if s["text"]),
+            "segments": segments,
+            "elapsed": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {"path": path, "error": str(e), "elapsed": time.perf_counter() - start}
+
+
+def default_workers():
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        cores = os.cpu_count() or 1
+    return max(1, cores // 4), cores
+
+
+def main(argv=None):
+    from audio_files import find_audio_files
+    from config import load_config
+
+    config = load_config()
+    workers, cores = default_workers()
+    parser = argparse.ArgumentParser(description="Transcribe audio files with WhisperDrop's model")
+    parser.add_argument("paths", nargs="+", help="audio files or directories")
+    parser.add_argument("--model", default=config["model_name"])
+    parser.add_argument("--cpu", action="store_true")
+    parser.add_argument("--cuda", action="store_true")
+    parser.add_argument("--workers", type=int, default=workers,
+                        help=f"model processes (default: {workers})")
+    parser.add_argument("--batched", action="store_true",
+                        help="use faster-whisper's batched pipeline in each worker")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", help="append JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    files = find_audio_files(args.paths)
+    if not files:
+        parser.error("no audio files found")
+
+    force_device = "cpu" if args.cpu else "cuda" if args.cuda else None
+    workers = max(1, min(args.workers, len(files)))
+    cpu_threads = max(1, cores // workers)
+    transcribe_options = dict(
+        beam_size=config["beam_size"],
+        language=config["language"],
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=300),
+    )
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    print(f"Transcribing {len(files)} files with {workers} worker(s) x {cpu_threads} threads",
+          file=sys.stderr)
+
+    audio_s = 0.0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(args.model, force_device, cpu_threads, args.batched),
+        ) as pool:
+            futures = [pool.submit(transcribe_file, path, transcribe_options, args.batch_size)
+                       for path in files]
+            for future in as_completed(futures):
+                result = future.result()
+                if "error" in result:
+                    failed += 1
+                    print(f"❌ {result['path']}: {result['error']}", file=sys.stderr)
+                else:
+                    audio_s += result["duration"]
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    wall_s = time.perf_counter() - start
+    print(f"✅ {len(files) - failed}/{len(files)} files, {audio_s / 3600:.2f} h of audio "
+          f"in {wall_s / 3600:.3f} h: {audio_s / wall_s:.1f} audio-hours per hour",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import time
+from collections import deque
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class UiProbe:
+    """Measures how responsive the Tk main loop is.
+
+    A heartbeat scheduled every ``interval_ms`` records how late it fires,
+    i.e. how long the event loop was blocked, and ``hotkey_handled`` records
+    how long a global-hotkey press took to reach its handler on the UI
+    thread. Only the most recent samples are kept.
+    """
+
+    def __init__(self, widget, interval_ms=20, samples=500):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.lateness = deque(maxlen=samples)
+        self.hotkey = deque(maxlen=50)
+        self.expected = 0.0
+
+    def start(self):
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.lateness.append(max(now - self.expected, 0.0))
+        self.expected = now + self.interval_ms / 1000
+        self.widget.after(self.interval_ms, self._tick)
+
+    def hotkey_handled(self, pressed_at):
+        latency = time.perf_counter() - pressed_at
+        self.hotkey.append(latency)
+        return latency
+
+    def report(self):
+        parts = []
+        for label, values in (("UI frame lateness", self.lateness), ("hotkey to UI", self.hotkey)):
+            if values:
+                parts.append(f"{label} p50 {percentile(values, 0.5) * 1000:.1f} / "
+                             f"p99 {percentile(values, 0.99) * 1000:.1f} / "
+                             f"max {max(values) * 1000:.1f} ms")
+        return ", ".join(parts)
@@ -0,0 +1,114 @@
+import queue
+import threading
+
+import numpy as np
+
+from audio_buffer import PreRollRing
+
+WINDOW = 512
+# Samples of the previous window Silero sees in front of each window
+CONTEXT = 64
+
+
+class SpeechGate:
+    """Online Silero VAD between the capture callback and an AudioBuffer.
+
+    ``append`` only queues the block, so the audio callback never runs the
+    VAD itself. A worker thread classifies 32 ms windows and forwards speech
+    plus ``pad_ms`` of context on each side; silence is dropped before it
+    is stored. ``on_silence`` fires once after ``auto_stop_s`` of silence
+    that follows speech.
+
+    Silero is stateful: ``SileroVADModel.__call__`` starts every call from
+    a fresh LSTM state and no context, so the gate runs its encoder and
+    decoder sessions itself and carries both across batches, scoring a
+    recording exactly as one offline pass over it would.
+    """
+
+    def __init__(self, buffer, samplerate=16000, threshold=0.5, pad_ms=300,
+                 auto_stop_s=0, on_silence=None, batch_windows=8):
+        self.buffer = buffer
+        self.threshold = threshold
+        self.neg_threshold = max(threshold - 0.15, 0.01)
+        self.pad_samples = samplerate * pad_ms // 1000
+        self.auto_stop_samples = int(samplerate * auto_stop_s)
+        self.on_silence = on_silence
+        self.batch = WINDOW * batch_windows
+        self.pad = PreRollRing(self.pad_samples)
+        self.queue = queue.SimpleQueue()
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.in_speech = False
+        self.heard_speech = False
+        self.hangover = 0
+        self.trailing = 0
+        self.seen = 0
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.context = np.zeros(CONTEXT, dtype=np.float32)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append(self, block):
+        self.queue.put(block.copy())
+
+    def _run(self):
+        from faster_whisper.vad import get_vad_model
+        self.model = get_vad_model()
+        while True:
+            block = self.queue.get()
+            if block is None:
+                break
+            self.pending = np.concatenate((self.pending, block))
+            if len(self.pending) >= self.batch:
+                self._classify(len(self.pending) // WINDOW * WINDOW)
+
+        if len(self.pending):
+            padded = -len(self.pending) % WINDOW
+            self.pending = np.concatenate((self.pending, np.zeros(padded, dtype=np.float32)))
+            self._classify(len(self.pending))
+
+    def _classify(self, n):
+        audio, self.pending = self.pending[:n], self.pending[n:]
+        windows = audio.reshape(-1, WINDOW)
+        contexts = np.vstack((self.context, windows[:-1, -CONTEXT:]))
+        self.context = windows[-1, -CONTEXT:].copy()
+        features = self.model.encoder_session.run(
+            None, {"input": np.concatenate((contexts, windows), axis=1)})[0].reshape(len(windows), 128)
+        for window, feature in zip(windows, features):
+            prob, self.state = self.model.decoder_session.run(
+                None, {"input": feature[None, :], "state": self.state})
+            self._gate(window, prob.item())
+
+    def _gate(self, window, prob):
+        self.seen += len(window)
+        if prob >= self.threshold or (self.in_speech and prob >= self.neg_threshold):
+            if not self.in_speech:
+                self.buffer.append(self.pad.snapshot())
+                self.pad.clear()
+            self.in_speech = True
+            self.heard_speech = True
+            self.hangover = self.pad_samples
+            self.trailing = 0
+            self.buffer.append(window)
+            return
+
+        self.in_speech = False
+        if self.hangover > 0:
+            self.buffer.append(window)
+            self.hangover -= len(window)
+        else:
+            self.pad.append(window)
+
+        if self.heard_speech and self.auto_stop_samples:
+            self.trailing += len(window)
+            if self.trailing >= self.auto_stop_samples and self.on_silence is not None:
+                self.on_silence()
+                self.on_silence = None
+
+    def close(self):
+        """Flush queued audio through the VAD and return the gated buffer."""
+        self.queue.put(None)
+        self.thread.join()
+        return self.buffer
@@ -0,0 +1,114 @@
+import time
+
+from Xlib import X, XK, display
+from Xlib.ext import xtest
+
+SPECIAL_KEYSYMS = {
+    "\n": XK.XK_Return,
+    "\t": XK.XK_Tab,
+}
+
+
+def char_to_keysym(char):
+    if char in SPECIAL_KEYSYMS:
+        return SPECIAL_KEYSYMS[char]
+    code = ord(char)
+    # Latin-1 keysyms equal their code point, the rest of Unicode is offset
+    if 0x20 <= code <= 0xff:
+        return code
+    return 0x01000000 | code
+
+
+class XTestTyper:
+    """In-process keyboard injection through the XTEST extension.
+
+    Keycode lookups are cached per character. Characters missing from the
+    current layout are typed by temporarily binding them to a spare keycode,
+    the same trick xdotool uses. Modifiers still held down (e.g. from the
+    hotkey) are released first, like ``xdotool --clearmodifiers``, so they
+    do not combine with the typed keys; they are not pressed again, so a key
+    let go meanwhile cannot get stuck.
+    """
+
+    def __init__(self):
+        self.display = display.Display()
+        if not self.display.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        self.keys = {}
+        self.shift = self.display.keysym_to_keycode(XK.XK_Shift_L)
+        self.control = self.display.keysym_to_keycode(XK.XK_Control_L)
+        self.spare = self._find_spare_keycode()
+
+    def _find_spare_keycode(self):
+        info = self.display.display.info
+        count = info.max_keycode - info.min_keycode + 1
+        mapping = self.display.get_keyboard_mapping(info.min_keycode, count)
+        for offset in range(count - 1, -1, -1):
+            if not any(mapping[offset]):
+                return info.min_keycode + offset
+        return None
+
+    def _release_modifiers(self):
+        pressed = self.display.query_keymap()
+        for keycodes in self.display.get_modifier_mapping():
+            for keycode in keycodes:
+                if keycode and pressed[keycode // 8] & (1 << (keycode % 8)):
+                    xtest.fake_input(self.display, X.KeyRelease, keycode)
+
+    def _lookup(self, char):
+        if char not in self.keys:
+            keysym = char_to_keysym(char)
+            self.keys[char] = None
+            for keycode, index in self.display.keysym_to_keycodes(keysym):
+                if index in (0, 1):
+                    self.keys[char] = (keycode, index == 1)
+                    break
+        return self.keys[char]
+
+    def _tap(self, keycode, shift=False):
+        if shift:
+            xtest.fake_input(self.display, X.KeyPress, self.shift)
+        xtest.fake_input(self.display, X.KeyPress, keycode)
+        xtest.fake_input(self.display, X.KeyRelease, keycode)
+        if shift:
+            xtest.fake_input(self.display, X.KeyRelease, self.shift)
+
+    def can_type(self, text):
+        """False if ``text`` needs a spare keycode and there is none."""
+        return self.spare is not None or all(self._lookup(char) is not None for char in text)
+
+    def _tap_unmapped(self, char):
+        if self.spare is None:
+            raise RuntimeError(f"No spare keycode to type {char!r}")
+        keysym = char_to_keysym(char)
+        self.display.change_keyboard_mapping(self.spare, [(keysym, keysym)])
+        self.display.sync()
+        # Give clients time to process the MappingNotify before the key lands
+        time.sleep(0.01)
+        self._tap(self.spare)
+        self.display.sync()
+        self.display.change_keyboard_mapping(self.spare, [(X.NoSymbol, X.NoSymbol)])
+
+    def type(self, text):
+        self._release_modifiers()
+        for char in text:
+            key = self._lookup(char)
+            if key is None:
+                self._tap_unmapped(char)
+            else:
+                self._tap(*key)
+        self.display.sync()
+
+    def backspace(self, count):
+        self._release_modifiers()
+        keycode = self.display.keysym_to_keycode(XK.XK_BackSpace)
+        for _ in range(count):
+            self._tap(keycode)
+        self.display.sync()
+
+    def paste(self):
+        self._release_modifiers()
+        xtest.fake_input(self.display, X.KeyPress, self.control)
+        self._tap(self.display.keysym_to_keycode(XK.XK_v))
+        xtest.fake_input(self.display, X.KeyRelease, self.control)
+        self.display.sync()